@@ -1,12 +1,13 @@
+import contextlib
 import multiprocessing
 import os
+import tempfile
 import traceback
-from typing import Literal, Optional, Union
+from typing import TYPE_CHECKING, Literal, Optional, Union
 import joblib
+from joblib.externals.loky import get_reusable_executor
 import pandas as pd
-from concurrent.futures import ProcessPoolExecutor, as_completed, Future
-
-from fptools.preprocess.common import Processor
+from concurrent.futures import FIRST_COMPLETED, Executor, ProcessPoolExecutor, ThreadPoolExecutor, Future, wait
 
 from .common import DataLocator, DataTypeAdaptor
 from .med_associates import find_ma_blocks
@@ -14,6 +15,10 @@ from .tdt import find_tdt_blocks
 from .session import Session, SessionCollection
 from tqdm.auto import tqdm
 
+if TYPE_CHECKING:
+    # only needed for annotations; importing at runtime would pull matplotlib into every `import fptools.io`
+    from fptools.preprocess.common import Processor
+
 
 def load_manifest(path: str, index: Optional[str] = None) -> pd.DataFrame:
     """Load a manifest file, accepting most common tabular formats.
@@ -58,16 +63,29 @@ def load_data(
     manifest_index: str = "blockname",
     max_workers: Optional[int] = None,
     locator: Union[Literal["auto", "tdt", "ma"], DataLocator] = "auto",
-    preprocess: Optional[Processor] = None,
+    preprocess: Optional["Processor"] = None,
     cache: bool = True,
     cache_dir: str = "cache",
+    executor_type: Literal["process", "loky", "thread"] = "process",
+    cache_format: Literal["gzip", "lzf", "mmap"] = "gzip",
 ) -> SessionCollection:
     """Load blocks from `tank_path` and return a `SessionCollection`.
 
-    Loading will happen in parallel, split across `max_workers` worker processes.
+    Loading will happen in parallel, split across `max_workers` workers. By default, workers are separate processes, which
+    isolates each block but requires every loaded `Session` (including all signal arrays) to be pickled back to the
+    parent process. Setting `executor_type="thread"` instead loads blocks on a thread pool, avoiding that serialization
+    entirely, which is usually faster when loading is dominated by file I/O and numpy operations. Setting `executor_type="loky"`
+    loads blocks on a reusable process pool, which is kept alive between calls to `load_data`, so repeated loads do not pay the
+    cost of starting worker processes and importing packages each time.
 
     For quicker future loading, results may be cached. Caching is controlled by the `cache` parameter, and the location of cached
-    files is controlled by the `cache_dir` parameter.
+    files is controlled by the `cache_dir` parameter. By default signal data is gzip compressed in the cache, which keeps cache files
+    small but requires decompressing all signal data on every load. With `cache_format="lzf"`, signal data is instead compressed with
+    the LZF filter bundled with h5py, which compresses less but is several times faster to write and read than gzip. With
+    `cache_format="mmap"`, signal data is cached uncompressed and memory-mapped when loaded from the cache, so data is only paged in
+    from disk as it is accessed. Cache files written in any format can be read regardless of the current `cache_format`. When loading with a process based executor and `cache_format="mmap"`,
+    workers only send the path of the written cache file back to the parent, which then memory-maps it, rather than pickling every
+    signal array through the process boundary.
 
     You can specify a manifest (in TSV, CSV or XLSX formats) containing additional metadata to be injected into the loaded data.
     This manifest should have at minimum one column with header `blockname` containing each block's name. You may include any other arbitrary
@@ -88,15 +106,32 @@ def load_data(
         preprocess: preprocess routine to run on the data. See above for more details.
         cache: If `True`, results will be cached for future use, or results will be loaded from the cache.
         cache_dir: path to the cache
+        executor_type: type of worker pool used for loading, one of "process", "loky" or "thread". See above for more details.
+        cache_format: storage format for cached signal data, one of "gzip", "lzf" or "mmap". See above for more details.
 
     Returns:
         `SessionCollection` containing loaded data
     """
+    if cache_format not in ("gzip", "lzf", "mmap"):
+        raise ValueError(f'Did not understand cache_format "{cache_format}". Supported values are "gzip", "lzf" or "mmap".')
+
     has_manifest = False
+    excluded_blocks: set[str] = set()
+    manifest_records: dict[str, dict] = {}
     if manifest_path is not None:
         manifest = load_manifest(manifest_path, index=manifest_index)
         has_manifest = True
 
+        # convert the manifest to plain dicts once, so each block only requires a dict lookup
+        if not manifest.index.is_unique:
+            duplicates = manifest.index[manifest.index.duplicated()].unique().tolist()
+            raise ValueError(f'Manifest column "{manifest_index}" must be unique, but found duplicates: {duplicates}')
+        manifest_records = manifest.to_dict(orient="index")
+
+        # determine up front which blocks are flagged for exclusion, so each block only requires a set lookup
+        if "exclude" in manifest.columns:
+            excluded_blocks = set(manifest.index[manifest["exclude"].fillna(False).astype(bool)])
+
     # if caching is enabled, make sure the cache directory exists
     if cache:
         os.makedirs(cache_dir, exist_ok=True)
@@ -104,55 +139,88 @@ def load_data(
     # create a collection to hold the loaded sessions
     sessions = SessionCollection()
 
-    futures: dict[Future[Session], str] = {}
-    context = multiprocessing.get_context("spawn")
-    max_tasks_per_child = 1
-    with ProcessPoolExecutor(max_workers=max_workers, mp_context=context, max_tasks_per_child=max_tasks_per_child) as executor:
-        # collect common worker args in one place
-        worker_args = {"preprocess": preprocess, "cache": cache, "cache_dir": cache_dir}
+    pool: contextlib.AbstractContextManager[Executor]
+    if executor_type == "process":
+        context = multiprocessing.get_context("spawn")
+        max_tasks_per_child = 1
+        pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=context, max_tasks_per_child=max_tasks_per_child)
+    elif executor_type == "loky":
+        # the reusable executor outlives this call, so it must not be shut down when we are finished with it
+        pool = contextlib.nullcontext(get_reusable_executor(max_workers=max_workers))
+    elif executor_type == "thread":
+        pool = ThreadPoolExecutor(max_workers=max_workers)
+    else:
+        raise ValueError(f'Did not understand executor_type "{executor_type}". Supported values are "process", "loky" or "thread".')
+
+    # workers in another process can hand back the path of a memory-mappable cache file instead of pickling the session
+    return_path = cache and cache_format == "mmap" and executor_type != "thread"
+
+    # resolve which datasets should be loaded, and attach any manifest metadata
+    dsets: list[DataTypeAdaptor] = []
+    for dset in _get_locator(locator)(tank_path):
+
+        # check if we were given a manifest. If so, try to load metadata from the manifest
+        # also perform some sanity checks along the way, and check some special flags (ex `exclude`)
+        if has_manifest:
+            # possibly exclude the block, if flagged in the manifest
+            if dset.name in excluded_blocks:
+                tqdm.write(f'Excluding block "{dset.name}" due to manifest exclude flag')
+                continue
+
+            if dset.name not in manifest_records:
+                # this block is not listed in the manifest! Err on the side of caution and exclude the block
+                tqdm.write(f'WARNING: Excluding block "{dset.name}" because it is not listed in the manifest!!')
+                continue
+            dset.metadata.update(manifest_records[dset.name])
+
+        dsets.append(dset)
+
+    # bound the number of tasks submitted to the pool at any one time, so pending tasks and their results
+    # do not pile up in the pool's queues when there are many more blocks than workers
+    max_in_flight = 4 * (max_workers or os.cpu_count() or 1)
+
+    futures: dict[Future[Union[Session, str]], str] = {}
+    with pool as executor, tqdm(total=len(dsets)) as pbar:
+        pending = iter(dsets)
+        while True:
+            # top up the pool with new tasks
+            for dset in pending:
+                f = executor.submit(
+                    _load, dset, preprocess=preprocess, cache=cache, cache_dir=cache_dir, cache_format=cache_format, return_path=return_path
+                )
+                futures[f] = dset.name
+                if len(futures) >= max_in_flight:
+                    break
 
-        # iterate over all datasets found by the locator
-        for dset in _get_locator(locator)(tank_path):
+            if len(futures) == 0:
+                break
 
-            # check if we were given a manifest. If so, try to load metadata from the manifest
-            # also perform some sanity checks along the way, and check some special flags (ex `exclude`)
-            if has_manifest:
+            # collect completed tasks
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for f in done:
+                block_name = futures.pop(f)
                 try:
-                    block_meta = manifest.loc[dset.name].to_dict()
-                    dset.metadata.update(block_meta)
-                except KeyError:
-                    # this block is not listed in the manifest! Err on the side of caution and exclude the block
-                    tqdm.write(f'WARNING: Excluding block "{dset.name}" because it is not listed in the manifest!!')
-                    continue
-
-                # possibly exclude the block, if flagged in the manifest
-                if "exclude" in block_meta and block_meta["exclude"]:
-                    tqdm.write(f'Excluding block "{dset.name}" due to manifest exclude flag')
-                    continue
-
-            # submit the task to the pool
-            f = executor.submit(_load, dset, preprocess=preprocess, cache=cache, cache_dir=cache_dir)
-            futures[f] = dset.name
-
-        # collect completed tasks
-        for f in tqdm(as_completed(futures), total=len(futures)):
-            try:
-                sessions.append(f.result())
-            except Exception as e:
-                tqdm.write(
-                    f'Encountered problem loading data at "{futures[f]}":\n{traceback.format_exc()}\nData will be omitted from the final collection!\n'
-                )
-                pass
+                    result = f.result()
+                    if isinstance(result, str):
+                        result = Session.load(result, mmap=True)
+                    sessions.append(result)
+                except Exception as e:
+                    tqdm.write(
+                        f'Encountered problem loading data at "{block_name}":\n{traceback.format_exc()}\nData will be omitted from the final collection!\n'
+                    )
+                pbar.update(1)
 
     return sessions
 
 
 def _load(
     dset: DataTypeAdaptor,
-    preprocess: Optional[Processor] = None,
+    preprocess: Optional["Processor"] = None,
     cache: bool = True,
     cache_dir: str = "cache",
-) -> Session:
+    cache_format: Literal["gzip", "lzf", "mmap"] = "gzip",
+    return_path: bool = False,
+) -> Union[Session, str]:
     """Load data for the given DataTypeAdaptor.
 
     Handles session instance creation, loading across possibly multiple loaders, caching, preprocessing
@@ -163,6 +231,8 @@ def _load(
         preprocess: preprocess routine to run on the data.
         cache: If `True`, results will be cached for future use, or results will be loaded from the cache.
         cache_dir: path to the cache
+        cache_format: storage format for cached signal data, one of "gzip", "lzf" or "mmap"
+        return_path: if `True` and `cache` is enabled, return the path to the cache file rather than the `Session` itself
         **kwargs: additional keyword arguments to pass to the `preprocess` callable.
     """
     cache_path = os.path.join(cache_dir, f"{dset.name}.h5")
@@ -187,7 +257,9 @@ def _load(
         if sigs_ok:
             # the cached version exists and the signatures match, so load and return that
             tqdm.write(f'loading cache: "{cache_path}"')
-            return Session.load(cache_path)
+            if return_path:
+                return cache_path
+            return Session.load(cache_path, mmap=(cache_format == "mmap"))
 
     # proper cached version does not exist, we need to load the data from scratch
 
@@ -209,11 +281,48 @@ def _load(
 
     # cache the session, if requested
     if cache:
-        session.save(cache_path)
+        cached = _save_cache(session, cache_path, compression=(None if cache_format == "mmap" else cache_format))
+        if cached and return_path:
+            return cache_path
 
     return session
 
 
+def _save_cache(session: Session, cache_path: str, compression: Optional[str]) -> bool:
+    """Atomically save a Session to a cache file.
+
+    The session is written to a temporary file in the same directory and then moved over `cache_path`. Sessions
+    previously loaded from `cache_path` with `mmap=True` keep mapping the old file, rather than seeing it truncated
+    and rewritten underneath them.
+
+    Windows refuses to replace a file which is still memory-mapped. In that case the cache is left as it was, and the
+    caller should carry on with the in-memory `session`.
+
+    Args:
+        session: the session to save
+        cache_path: path of the cache file
+        compression: compression filter passed to `Session.save()`
+
+    Returns:
+        True if the cache file was written, False if the existing cache file could not be replaced
+    """
+    fd, tmp_path = tempfile.mkstemp(suffix=".h5", dir=os.path.dirname(cache_path) or None)
+    os.close(fd)
+    try:
+        session.save(tmp_path, compression=compression)
+        os.replace(tmp_path, cache_path)
+    except PermissionError:
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)
+        tqdm.write(f'could not replace cache "{cache_path}", it may still be in use; continuing without caching')
+        return False
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)
+        raise
+    return True
+
+
 def _get_locator(locator: Union[Literal["auto", "tdt", "ma"], DataLocator] = "auto") -> DataLocator:
     """Translate a flexible locator argument to a concrete DataLoader implementation.
 
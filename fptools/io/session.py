@@ -17,6 +17,35 @@ from .signal import Signal
 FieldList = Union[Literal["all"], list[str]]
 
 
+def resolve_fields(fields: FieldList) -> Optional[frozenset[str]]:
+    """Resolve a `FieldList` into a set of field names, for repeated use with `select_fields()`.
+
+    Args:
+        fields: list of field names, or the special str "all"
+
+    Returns:
+        frozenset of field names, or None if all fields should be selected
+    """
+    if fields == "all":
+        return None
+    return frozenset(fields)
+
+
+def select_fields(data: dict[str, Any], fields: Optional[frozenset[str]]) -> dict[str, Any]:
+    """Select a subset of fields from `data`, preserving the order of `data`.
+
+    Args:
+        data: mapping to select fields from, ex. `Session.metadata`
+        fields: field names to select, as returned by `resolve_fields()`. If None, all fields are selected
+
+    Returns:
+        mapping containing only the selected fields
+    """
+    if fields is None:
+        return data
+    return {k: v for k, v in data.items() if k in fields}
+
+
 def empty_array() -> np.ndarray:
     """Create an empty numpy array.
 
@@ -26,6 +55,73 @@ def empty_array() -> np.ndarray:
     return np.ndarray([], dtype=np.float64)
 
 
+def _read_dataset(h5: h5py.File, name: str, file_map: Optional[np.memmap] = None) -> np.ndarray:
+    """Read an array dataset from an open HDF5 file, optionally as a view into a memory-mapping of the file.
+
+    Only contiguous, uncompressed datasets can be memory-mapped (see `Session.save(compression=None)`). Other datasets
+    are always read into memory. Memory-mapped arrays are copy-on-write, so they may be freely modified without
+    altering the file on disk.
+
+    Args:
+        h5: the open HDF5 file
+        name: name of the dataset to read
+        file_map: if not None, a byte-wise memory-mapping of the whole file, which the dataset should be viewed from when possible
+
+    Returns:
+        the dataset as a numpy array
+    """
+    dset = h5[name]
+    if file_map is not None and dset.chunks is None and dset.compression is None and dset.size > 0:
+        offset = dset.id.get_offset()
+        if offset is not None:
+            return file_map[offset : offset + dset.nbytes].view(dset.dtype).reshape(dset.shape)
+    return dset[()]
+
+
+def _write_array_group(h5: h5py.File, name: str, arrays: dict[str, np.ndarray]) -> None:
+    """Write a collection of named arrays (ex. epocs or scalars) to a group of an open HDF5 file.
+
+    Sessions often hold many small arrays, and each HDF5 dataset carries a fixed cost to create and read. When all arrays are
+    one-dimensional and share a numeric dtype, they are packed end-to-end into a single dataset, alongside their names and
+    offsets into the packed data. Otherwise, each array is written to its own dataset.
+
+    Args:
+        h5: the open HDF5 file
+        name: name of the group to create
+        arrays: mapping of array names to arrays
+    """
+    group = h5.create_group(name)
+    values = [np.asarray(v) for v in arrays.values()]
+    dtypes = {v.dtype for v in values}
+    if len(values) > 0 and all(v.ndim == 1 for v in values) and len(dtypes) == 1 and dtypes.pop().kind in "biuf":
+        group.attrs["packed"] = True
+        group.create_dataset("names", data=list(arrays.keys()))
+        group.create_dataset("offsets", data=np.cumsum([0] + [len(v) for v in values]))
+        group.create_dataset("data", data=np.concatenate(values), compression="gzip")
+    else:
+        for k, v in arrays.items():
+            group.create_dataset(k, data=v, compression="gzip")
+
+
+def _read_array_group(h5: h5py.File, name: str) -> dict[str, np.ndarray]:
+    """Read a collection of named arrays written by `_write_array_group()` from an open HDF5 file.
+
+    Args:
+        h5: the open HDF5 file
+        name: name of the group to read
+
+    Returns:
+        mapping of array names to arrays
+    """
+    group = h5[name]
+    if group.attrs.get("packed", False):
+        names = [n.decode("utf-8") for n in group["names"][()]]
+        offsets = group["offsets"][()]
+        data = group["data"][()]
+        return {n: data[offsets[i] : offsets[i + 1]] for i, n in enumerate(names)}
+    return {k: group[k][()] for k in group.keys()}
+
+
 class Session(object):
     """Holds data and metadata for a single session."""
 
@@ -180,10 +276,7 @@ class Session(object):
             DataFrame with data from this session
         """
         # determine metadata fields to include
-        if include_meta == "all":
-            meta = self.metadata
-        else:
-            meta = {k: v for k, v in self.metadata.items() if k in include_meta}
+        meta = select_fields(self.metadata, resolve_fields(include_meta))
 
         # determine arrays to include
         if include_epocs == "all":
@@ -191,15 +284,20 @@ class Session(object):
         else:
             epoc_names = [k for k in self.epocs.keys() if k in include_epocs]
 
-        # iterate arrays and include any the user requested
-        # also add in any requested metadata
-        events = []
-        for k, v in self.epocs.items():
-            if k in epoc_names:
-                for value in v:
-                    events.append({**meta, "event": k, "time": value})
-
-        df = pd.DataFrame(events)
+        # gather the requested arrays column-wise, and broadcast any requested metadata across all events
+        epocs = [np.atleast_1d(self.epocs[k]) for k in epoc_names]
+        n_events = sum(len(v) for v in epocs)
+        if n_events > 0:
+            df = pd.DataFrame(
+                {
+                    **{k: [v] * n_events for k, v in meta.items()},
+                    "event": np.repeat(epoc_names, [len(v) for v in epocs]),
+                    "time": np.concatenate(epocs),
+                },
+                copy=False,
+            )
+        else:
+            df = pd.DataFrame()
 
         # sort the dataframe by time, but check that we have values, otherwise will raise keyerror
         if len(df.index) > 0:
@@ -218,10 +316,7 @@ class Session(object):
             DataFrame with data from this session
         """
         # determine metadata fields to include
-        if include_meta == "all":
-            meta = self.metadata
-        else:
-            meta = {k: v for k, v in self.metadata.items() if k in include_meta}
+        meta = select_fields(self.metadata, resolve_fields(include_meta))
 
         # determine scalars to include
         if include_scalars == "all":
@@ -229,11 +324,20 @@ class Session(object):
         else:
             scalar_names = [k for k in self.scalars.keys() if k in include_scalars]
 
-        scalars = []
-        for sn in scalar_names:
-            scalars.append({**meta, "scalar_name": sn, "scalar_value": self.scalars[sn]})
-
-        return pd.DataFrame(scalars)
+        if len(scalar_names) == 0:
+            return pd.DataFrame()
+
+        # build the dataframe column-wise, broadcasting any requested metadata across all scalars
+        scalar_values = np.empty(len(scalar_names), dtype=object)
+        scalar_values[:] = [self.scalars[sn] for sn in scalar_names]
+        return pd.DataFrame(
+            {
+                **{k: [v] * len(scalar_names) for k, v in meta.items()},
+                "scalar_name": scalar_names,
+                "scalar_value": scalar_values,
+            },
+            copy=False,
+        )
 
     def __eq__(self, value: object) -> bool:
         """Test this Session for equality to another Session.
@@ -305,11 +409,13 @@ class Session(object):
         """Estimate the total memory use of this Session in bytes."""
         return sum(self._estimate_memory_use_itemized().values())
 
-    def save(self, path: str):
+    def save(self, path: str, compression: Optional[str] = "gzip"):
         """Save this Session to a HDF5 file.
 
         Args:
             path: path where the data should be saved
+            compression: compression filter applied to signal data, see `h5py.Group.create_dataset()`. If None, signal
+                data is stored contiguously and uncompressed, which allows it to be memory-mapped by `Session.load(mmap=True)`.
         """
         with h5py.File(path, mode="w") as h5:
             # save name
@@ -324,8 +430,8 @@ class Session(object):
             h5.create_group("/signals")
             for k, sig in self.signals.items():
                 group = h5.create_group(f"/signals/{k}")
-                group.create_dataset("signal", data=sig.signal, compression="gzip")
-                group.create_dataset("time", data=sig.time, compression="gzip")
+                group.create_dataset("signal", data=sig.signal, compression=compression)
+                group.create_dataset("time", data=sig.time, compression=compression)
                 group.attrs["units"] = sig.units
                 group.attrs["fs"] = sig.fs
                 mark_group = group.create_group("marks")
@@ -333,14 +439,10 @@ class Session(object):
                     mark_group.create_dataset(mk, data=mv)
 
             # save epocs
-            h5.create_group("/epocs")
-            for k, epoc in self.epocs.items():
-                h5.create_dataset(f"/epocs/{k}", data=np.atleast_1d(epoc), compression="gzip")
+            _write_array_group(h5, "/epocs", {k: np.atleast_1d(epoc) for k, epoc in self.epocs.items()})
 
             # save scalars
-            h5.create_group("/scalars")
-            for k, scalar in self.scalars.items():
-                h5.create_dataset(f"/scalars/{k}", data=scalar, compression="gzip")
+            _write_array_group(h5, "/scalars", dict(self.scalars))
 
             # save metadata
             meta_group = h5.create_group("/metadata")
@@ -384,16 +486,23 @@ class Session(object):
         return signatures
 
     @classmethod
-    def load(cls, path: str) -> "Session":
+    def load(cls, path: str, mmap: bool = False) -> "Session":
         """Load a Session from an HDF5 file.
 
         Args:
             path: path to the hdf5 file to load
+            mmap: if True, memory-map signal data rather than reading it into memory, for signals which were saved
+                uncompressed (see `Session.save(compression=None)`). Memory-mapped signals are copy-on-write, so
+                modifying them never alters the file. The file must not be modified or overwritten in place while
+                mapped sessions are alive; replace it with a new file instead (e.g. write elsewhere and `os.replace()`).
+                On Windows, a mapped file cannot be replaced either until all sessions mapping it have been released.
 
         Returns:
             Session with data loaded
         """
         session = cls()
+        # map the file once, and hand out views of it for each dataset, rather than mapping every dataset separately
+        file_map = np.memmap(path, mode="c", dtype=np.uint8) if mmap else None
         with h5py.File(path, mode="r") as h5:
             # read name
             session.name = h5["/name"][()].decode("utf-8")
@@ -408,7 +517,11 @@ class Session(object):
                 for signame in h5["/signals"].keys():
                     sig_group = h5[f"/signals/{signame}"]
                     sig = Signal(
-                        signame, sig_group["signal"][()], time=sig_group["time"][()], fs=sig_group.attrs["fs"], units=sig_group.attrs["units"]
+                        signame,
+                        _read_dataset(h5, f"/signals/{signame}/signal", file_map),
+                        time=_read_dataset(h5, f"/signals/{signame}/time", file_map),
+                        fs=sig_group.attrs["fs"],
+                        units=sig_group.attrs["units"],
                     )
                     for mark_name in sig_group["marks"].keys():
                         sig.marks[mark_name] = sig_group[f"marks/{mark_name}"][()]
@@ -416,13 +529,11 @@ class Session(object):
 
             # read epocs
             if "/epocs" in h5:
-                for epoc_name in h5["/epocs"].keys():
-                    session.epocs[epoc_name] = h5[f"/epocs/{epoc_name}"][()]
+                session.epocs.update(_read_array_group(h5, "/epocs"))
 
             # read scalars
             if "/scalars" in h5:
-                for scalar_name in h5["/scalars"].keys():
-                    session.scalars[scalar_name] = h5[f"/scalars/{scalar_name}"][()]
+                session.scalars.update(_read_array_group(h5, "/scalars"))
 
             # read metadata
             if "/metadata" in h5:
@@ -686,12 +797,10 @@ class SessionCollection(list[Session]):
         Returns:
             signal across sessions as a `pandas.DataFrame`
         """
+        keep_meta = resolve_fields(include_meta)
         dfs = []
         for session in self:
-            if include_meta == "all":
-                meta = session.metadata
-            else:
-                meta = {k: v for k, v in session.metadata.items() if k in include_meta}
+            meta = select_fields(session.metadata, keep_meta)
 
             sig = session.signals[signal]
             df = sig.to_dataframe()
@@ -1,12 +1,77 @@
 import datetime
-from functools import partial
+from functools import lru_cache, partial
 import sys
 from typing import Any, Callable, Literal, Optional, Union, cast, overload
 
 import numpy as np
+import numpy.typing as npt
 import pandas as pd
 
 
+@lru_cache(maxsize=32)
+def _sample_column_labels(nsamples: int) -> pd.Index:
+    """Get sample column labels of the form `Y.{i}`, using 1-based indexing.
+
+    Labels are cached per `nsamples`, since signals collected across sessions typically share the same length.
+
+    Args:
+        nsamples: number of samples to generate labels for
+
+    Returns:
+        `pandas.Index` of sample column labels
+    """
+    return pd.Index([f"Y.{i}" for i in range(1, nsamples + 1)])
+
+
+def _median_axis0(data: np.ndarray) -> np.ndarray:
+    """Compute the median of `data` along axis 0.
+
+    Sorting along the (typically short) observation axis is considerably faster than `np.median()`, which
+    partitions a copy of the data. NaNs sort to the end, so any column containing NaN yields NaN, matching `np.median()`.
+
+    Args:
+        data: array of shape (nobs, nsamples)
+
+    Returns:
+        array of shape (nsamples,) with the median of each column
+    """
+    ordered = np.sort(data, axis=0)
+    if not np.issubdtype(ordered.dtype, np.inexact):
+        # like `np.median()`, the median of integer data is floating point
+        ordered = ordered.astype(np.float64)
+    n = ordered.shape[0]
+    if n % 2 == 1:
+        med = ordered[n // 2].copy()
+    else:
+        med = (ordered[n // 2 - 1] + ordered[n // 2]) / 2
+    if np.issubdtype(ordered.dtype, np.inexact):
+        med[np.isnan(ordered[-1])] = np.nan
+    return med
+
+
+def _estimate_fs(time: np.ndarray) -> float:
+    """Estimate the sampling frequency of a Signal from its sampled timepoints.
+
+    Args:
+        time: array of sampled timepoints
+
+    Returns:
+        reciprocal of the median interval between timepoints
+    """
+    # the intervals are a temporary array, so let the median partition them in place rather than partitioning another copy
+    return 1 / np.median(np.diff(time), overwrite_input=True)
+
+
+_AGGREGATE_REDUCTIONS: dict[str, Callable[[np.ndarray], np.ndarray]] = {
+    **{name: partial(getattr(np, name), axis=0) for name in ("var", "min", "max", "nanmean", "nanmedian", "nanstd", "nansum")},
+    "mean": lambda data: data.mean(axis=0),
+    "median": _median_axis0,
+    "sum": lambda data: data.sum(axis=0),
+    "std": lambda data: data.std(axis=0),
+}
+"""Column-wise reductions used by `Signal.aggregate()`, keyed by reduction name and resolved once at import."""
+
+
 class Signal(object):
     """Represents a real valued signal with fixed interval sampling.
 
@@ -47,20 +112,23 @@ class Signal(object):
             self.time = time
             self.fs = fs
             # just do a sanity check that the two pieces of information make sense
-            if not np.isclose(self.fs, 1 / np.median(np.diff(time))):
-                raise ValueError(
-                    f"Both `time` and `fs` were provided, but they do not match!\n  fs={fs}\ntime={1 / np.median(np.diff(time))}"
-                )
+            # the sample rate is estimated from time exactly as when `fs` is not provided, so that a Signal built from `time`
+            # alone can always be rebuilt from its `time` and `fs` (ex. `Signal.copy()`, `Session.load()`)
+            if time.shape[0] > 1:
+                with np.errstate(divide="ignore"):
+                    time_fs = _estimate_fs(time)  # infinite if time does not advance
+                if not np.isfinite(time_fs) or not np.isclose(fs, time_fs):
+                    raise ValueError(f"Both `time` and `fs` were provided, but they do not match!\n  fs={fs}\ntime={time_fs}")
 
         elif time is None and fs is not None:
             # sampling frequency is provided, infer time from fs
             self.fs = fs
-            self.time = np.linspace(1, signal.shape[-1], signal.shape[-1]) / self.fs
+            self.time = np.arange(1, signal.shape[-1] + 1, dtype=np.float64) / self.fs
 
         elif fs is None and time is not None:
             # time is provided, so lets estimate the sampling frequency
             self.time = time
-            self.fs = 1 / np.median(np.diff(time))
+            self.fs = _estimate_fs(time)
 
         else:
             # neither time or sampling frequency provided, we need at least one!
@@ -88,6 +156,27 @@ class Signal(object):
         """Get the sample index closest to time `t`."""
         return int((np.abs(self.time - t)).argmin())
 
+    def tindices(self, t: npt.ArrayLike) -> np.ndarray:
+        """Get the sample indices closest to each of the times in `t`.
+
+        Equivalent to calling `tindex()` for each element of `t`, but locates all times with a single binary search
+        over `time`, which must be in increasing order.
+
+        Args:
+            t: times to locate
+
+        Returns:
+            array of sample indices, with the same shape as `t`
+        """
+        t = np.asarray(t, dtype=float)
+        if self.time.shape[0] < 2:
+            return np.zeros(t.shape, dtype=np.intp)
+
+        # candidates are the samples immediately before and after each time, ties go to the earlier sample like `tindex()`
+        right = np.clip(np.searchsorted(self.time, t), 1, self.time.shape[0] - 1)
+        left = right - 1
+        return np.where(np.abs(self.time[left] - t) <= np.abs(self.time[right] - t), left, right)
+
     def copy(self, new_name: Optional[str] = None) -> "Signal":
         """Return a deep copy of this signal.
 
@@ -100,11 +189,12 @@ class Signal(object):
         if new_name is None:
             new_name = self.name
         s = type(self)(new_name, self.signal.copy(), time=self.time.copy(), fs=self.fs, units=self.units)
-        s.marks.update(**self.marks)
+        if self.marks:
+            s.marks = dict(self.marks)
         return s
 
     def _check_other_compatible(self, other: "Signal") -> bool:
-        return self.nsamples == other.nsamples and self.nobs == self.nobs and self.fs == other.fs
+        return (self.nsamples, self.nobs, self.fs) == (other.nsamples, other.nobs, other.fs)
 
     def __eq__(self, value: object) -> bool:
         """Test if this Signal is equal to another Signal.
@@ -220,8 +310,9 @@ class Signal(object):
         Marks, units, and time will be propagated. The new signal will be named according to this signal, with `#{func_name}` appended.
 
         Args:
-            func: string or callable that take a (nobs x nsamples) array and returns a (nsamples,) shaped array. If a string
-                will be interpreted as the name of a numpy function (e.x. mean, median, etc)
+            func: string, ufunc, or callable that take a (nobs x nsamples) array and returns a (nsamples,) shaped array. If a string
+                will be interpreted as the name of a numpy function (e.x. mean, median, etc). If a ufunc, the ufunc is reduced along axis=0
+                (e.x. `np.maximum` or `np.add`)
 
         Returns:
             aggregated `Signal`
@@ -232,11 +323,11 @@ class Signal(object):
         else:
             f: Callable[[np.ndarray], np.ndarray]
             if isinstance(func, str):
-                f = partial(cast(np.ufunc, getattr(np, func)), axis=0)
+                f = _AGGREGATE_REDUCTIONS.get(func) or partial(cast(np.ufunc, getattr(np, func)), axis=0)
                 f_name = func
 
             elif isinstance(func, np.ufunc):
-                f = partial(func, axis=0)
+                f = partial(func.reduce, axis=0)
                 f_name = func.__name__
 
             else:
@@ -247,13 +338,31 @@ class Signal(object):
             s.marks.update(self.marks)
             return s
 
-    def to_dataframe(self) -> pd.DataFrame:
+    def to_dataframe(self, named: bool = True) -> pd.DataFrame:
         """Get the signal data as a `pandas.DataFrame`.
 
         Observations are across rows, and samples are across columns. Each sample column is named with
         the pattern `Y.{i+1}` where i is the sample index. This also implies 1-based indexing on the output.
+
+        The returned DataFrame wraps the signal data without copying it; copy the DataFrame before modifying values in place
+        if the underlying Signal should remain unchanged.
+
+        Args:
+            named: if True, name sample columns with the pattern `Y.{i+1}`. If False, sample columns are labeled with
+                an integer `pandas.RangeIndex` named "sample" (still 1-based), which avoids building string labels for long signals.
+
+        Returns:
+            `pandas.DataFrame` containing the signal data
         """
-        return pd.DataFrame(np.atleast_2d(self.signal), columns=[f"Y.{i+1}" for i in range(self.nsamples)])
+        columns: pd.Index
+        if named:
+            columns = _sample_column_labels(self.nsamples)
+        else:
+            columns = pd.RangeIndex(1, self.nsamples + 1, name="sample")
+
+        # present the signal as a (nobs, nsamples) C-ordered view, so pandas can wrap it without copying
+        data = np.ascontiguousarray(self.signal.reshape(self.nobs, self.nsamples))
+        return pd.DataFrame(data, columns=columns, copy=False)
 
     @overload
     def describe(self, as_str: Literal[True], prefix: str = "") -> str: ...
@@ -1,8 +1,8 @@
-import glob
 import os
-from typing import Optional
+from typing import Iterator, Optional
 
-import tdt
+import numpy as np
+import numpy.typing as npt
 
 from .common import DataTypeAdaptor
 from .session import Session, Signal
@@ -14,6 +14,36 @@ Used by load_tdt_block().
 """
 
 
+def _iter_tbk_files(root: str) -> Iterator[str]:
+    """Recursively find TDT block index (*.tbk) files beneath `root`.
+
+    Walks the directory tree with `os.scandir()`, matching the file extension (case-insensitively) on the directory
+    entry name, so no additional `stat()` calls are required for candidate files. As with `glob`, hidden files and
+    directories (those with names starting with ".") are skipped.
+
+    Args:
+        root: path to the directory to search
+
+    Yields:
+        paths to *.tbk files
+    """
+    stack = [root]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except OSError:
+            # as with `glob`, silently skip directories which are missing or cannot be read
+            continue
+        with entries:
+            for entry in entries:
+                if entry.name.startswith("."):
+                    continue
+                if entry.is_dir():
+                    stack.append(entry.path)
+                elif entry.name.lower().endswith(".tbk"):
+                    yield entry.path
+
+
 def find_tdt_blocks(path: str) -> list[DataTypeAdaptor]:
     """Data Locator for TDT blocks.
 
@@ -25,9 +55,8 @@ def find_tdt_blocks(path: str) -> list[DataTypeAdaptor]:
     Returns:
         list of DataTypeAdaptor, each adaptor corresponding to one session, of data to be loaded
     """
-    tbk_files = glob.glob(os.path.join(path, "**/*.[tT][bB][kK]"), recursive=True)
     items_out = []
-    for tbk in tbk_files:
+    for tbk in _iter_tbk_files(path):
         adapt = DataTypeAdaptor()
         adapt.path = os.path.dirname(tbk)  # the directory for the block
         adapt.name = os.path.basename(adapt.path)  # the name of the directory
@@ -42,11 +71,21 @@ class TDTLoader:
         exclude_streams: Optional[list[str]] = None,
         exclude_epocs: Optional[list[str]] = None,
         exclude_scalars: Optional[list[str]] = None,
+        stream_dtype: Optional[npt.DTypeLike] = None,
     ) -> None:
-        """Initialize this TDTLoader."""
+        """Initialize this TDTLoader.
+
+        Args:
+            exclude_streams: names of streams which should not be loaded
+            exclude_epocs: names of epocs which should not be loaded
+            exclude_scalars: names of scalars which should not be loaded
+            stream_dtype: if not None, convert loaded stream data to this dtype (copying only if the data is not already
+                contiguous and of this dtype). If None, stream data is kept in whatever dtype it was read as.
+        """
         self.exclude_streams = exclude_streams or []
         self.exclude_epocs = exclude_epocs or []
         self.exclude_scalars = exclude_scalars or []
+        self.stream_dtype = stream_dtype
 
     def __call__(self, session: Session, path: str) -> Session:
         """Data Loader for TDT blocks.
@@ -58,6 +97,9 @@ class TDTLoader:
         Returns:
             Session object with data added
         """
+        # tdt is imported here, rather than at module level, so it is only loaded by code that actually reads TDT blocks
+        import tdt
+
         # read the block
         block = tdt.read_block(path)
 
@@ -69,7 +111,11 @@ class TDTLoader:
             if k in self.exclude_streams:
                 continue
             stream = block.streams[k]
-            session.add_signal(Signal(k, stream.data, fs=stream.fs, units="mV"))
+            data = stream.data
+            if self.stream_dtype is not None:
+                # only copies if the stream data is not already contiguous and of the requested dtype
+                data = np.ascontiguousarray(data, dtype=self.stream_dtype)
+            session.add_signal(Signal(k, data, fs=stream.fs, units="mV"))
 
         # add epocs
         for k in block.epocs.keys():
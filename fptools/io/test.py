@@ -1,11 +1,16 @@
-import glob
+from concurrent.futures import ThreadPoolExecutor
 import os
-from typing import Optional
+import tempfile
+import threading
+from typing import IO, Optional
 import zipfile
 
 import requests
 from tqdm.auto import tqdm
 
+_REQUEST_TIMEOUT = 30
+"""Seconds to wait for the server to respond (to connect, or to send more data) before giving up on a request."""
+
 def _get_default_test_data_location() -> str:
     """Get the default user test data location, in the users home directory.
 
@@ -32,57 +37,144 @@ def download_test_data(dest: Optional[str] = None) -> str:
     # ensure the destination directory exists
     os.makedirs(dest, exist_ok=True)
 
-    # check if the data appears to be already in place
-    if len(glob.glob(os.path.join(dest, "*"))) <= 0:
-        print(f'Downloading test data and unpacking to "{dest}"')
-
-        try:
-            # location where the zip file will be saved
-            zip_path = os.path.join(dest, 'test_data.zip')
-
-            # initiate the request for the data file, check status and calculate the size
-            response = requests.get(test_data_link, stream=True)
-            response.raise_for_status()  # Raise HTTPError for bad responses (4xx or 5xx)
-            total_size = int(response.headers.get('content-length', 0))
-            block_size = 1024
-
-            # commence with downloading the file, providing progress feedback along the way
-            with open(zip_path, 'wb') as zip_file, tqdm(
-                desc="Downloading",
-                total=total_size,
-                unit='iB',
-                unit_scale=True,
-                unit_divisor=1024,
-            ) as bar:
-                for data in response.iter_content(block_size):
-                    bar.update(len(data))
-                    zip_file.write(data)
+    # check if the data is already in place. A marker file holding the ETag of the downloaded archive is only written after
+    # the archive has been completely extracted, so partially extracted data is never mistaken for a complete copy
+    marker_path = os.path.join(dest, '.etag')
+    head = None
+    if os.path.exists(marker_path):
+        with open(marker_path, 'r') as f:
+            stored_etag = f.read()
+        head = _head(test_data_link)
+
+        # if we cannot reach the server, make do with the data we have
+        if head is None or head.headers.get('etag', '') == stored_etag:
+            print(f'Test data appears to already be in place at "{dest}".')
+            return dest
+        print('Test data has been updated since it was last downloaded.')
+
+    print(f'Downloading test data and unpacking to "{dest}"')
+
+    try:
+        # commence with downloading the file, providing progress feedback along the way
+        # the archive is buffered in memory, only spilling to a temporary file for large downloads, so we
+        # avoid writing and re-reading an intermediate zip file, and nothing is left behind if we crash
+        with tempfile.SpooledTemporaryFile(max_size=256 << 20, dir=dest) as zip_file:
+            etag = _download(test_data_link, zip_file, head=head)
+            zip_file.seek(0)
 
             # now unpack the zip file, providing progress feedback along the way
-            with zipfile.ZipFile(zip_path, 'r') as zip_ref, tqdm(
-                desc="Extracting",
-                total=len(zip_ref.namelist()),
-                unit="file",
-            ) as bar:
-                for file in zip_ref.namelist():
-                    zip_ref.extract(file, path=dest)
-                    bar.update(1)
-
-            # finally, remove the zip file
-            os.remove(zip_path)
-
-        except requests.exceptions.RequestException as e:
-            print(f"Request error: {e}")
-        except zipfile.BadZipFile as e:
-            print(f"Zip file error: {e}")
-        except Exception as e:
-            print(f"An error occurred: {e}")
-
-    else:
-        print(f'Test data appears to already be in place at "{dest}".')
+            with zipfile.ZipFile(zip_file, 'r') as zip_ref:
+                members = zip_ref.infolist()
+                with tqdm(
+                    desc="Extracting",
+                    total=sum(m.file_size for m in members),
+                    unit='iB',
+                    unit_scale=True,
+                    unit_divisor=1024,
+                ) as bar:
+                    for member in members:
+                        zip_ref.extract(member, path=dest)
+                        bar.update(member.file_size)
+
+        # everything is in place, mark the data as complete
+        with open(marker_path, 'w') as f:
+            f.write(etag)
+
+    except requests.exceptions.RequestException as e:
+        print(f"Request error: {e}")
+    except zipfile.BadZipFile as e:
+        print(f"Zip file error: {e}")
+    except Exception as e:
+        print(f"An error occurred: {e}")
 
     return dest
 
+def _head(url: str) -> Optional[requests.Response]:
+    """Make a HEAD request for a remote resource.
+
+    Args:
+        url: URL of the resource
+
+    Returns:
+        the response, or None if the server could not be reached or did not respond successfully.
+    """
+    try:
+        response = requests.head(url, allow_redirects=True, timeout=_REQUEST_TIMEOUT)
+        response.raise_for_status()
+    except requests.exceptions.RequestException:
+        return None
+    return response
+
+def _download(
+    url: str, fileobj: IO[bytes], head: Optional[requests.Response] = None, n_connections: int = 8, block_size: int = 1 << 20
+) -> str:
+    """Download `url` into `fileobj`.
+
+    If the server supports HTTP range requests, the file is split into `n_connections` ranges which are downloaded
+    concurrently, each written to its own position in `fileobj`. Otherwise, the file is downloaded over a single connection.
+
+    Args:
+        url: the URL to download
+        fileobj: writable, seekable binary file object to receive the downloaded data
+        head: response of an earlier successful HEAD request for `url`, if one was already made. If None, one is made here.
+        n_connections: number of concurrent connections to use when the server supports range requests
+        block_size: size of the blocks, in bytes, in which data is read from the connection(s)
+
+    Returns:
+        the ETag reported by the server for the downloaded file, or an empty string if the server did not provide one
+    """
+    # determine the size of the file, and if we are allowed to request parts of it
+    if head is None:
+        head = requests.head(url, allow_redirects=True, timeout=_REQUEST_TIMEOUT)
+        head.raise_for_status()
+    total_size = int(head.headers.get('content-length', 0))
+    supports_ranges = head.headers.get('accept-ranges', '').lower() == 'bytes'
+    etag = head.headers.get('etag', '')
+
+    with tqdm(
+        desc="Downloading",
+        total=total_size,
+        unit='iB',
+        unit_scale=True,
+        unit_divisor=1024,
+    ) as bar:
+        if supports_ranges and total_size >= n_connections * block_size:
+            lock = threading.Lock()
+
+            def fetch(start: int, stop: int) -> None:
+                response = requests.get(head.url, headers={'Range': f'bytes={start}-{stop - 1}'}, stream=True, timeout=_REQUEST_TIMEOUT)
+                response.raise_for_status()
+                if response.status_code != 206:
+                    raise requests.exceptions.RequestException('Server did not honor the range request')
+                position = start
+                for data in response.iter_content(block_size):
+                    with lock:
+                        fileobj.seek(position)
+                        fileobj.write(data)
+                        bar.update(len(data))
+                    position += len(data)
+
+            bounds = [total_size * i // n_connections for i in range(n_connections + 1)]
+            try:
+                with ThreadPoolExecutor(max_workers=n_connections) as pool:
+                    for future in [pool.submit(fetch, start, stop) for start, stop in zip(bounds[:-1], bounds[1:])]:
+                        future.result()
+                return etag
+            except requests.exceptions.RequestException:
+                # fall back to a plain download below
+                fileobj.seek(0)
+                fileobj.truncate()
+                bar.reset()
+
+        response = requests.get(url, stream=True, timeout=_REQUEST_TIMEOUT)
+        response.raise_for_status()  # Raise HTTPError for bad responses (4xx or 5xx)
+        for data in response.iter_content(block_size):
+            bar.update(len(data))
+            fileobj.write(data)
+
+    return etag
+
+
 def list_datasets(path: Optional[str] = None) -> list[str]:
     """List the datasets on path.
 
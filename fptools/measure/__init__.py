@@ -1,3 +1,3 @@
-from .signal_collector import collect_signals, collect_signals_2event
+from .signal_collector import collect_signals, collect_signals_2event, collect_signals_multi
 from .snr import measure_snr_event, measure_snr_overall
 from .peaks import measure_peaks, detect_naive_peaks
@@ -1,10 +1,12 @@
-from typing import Protocol, Union, runtime_checkable
+from collections import defaultdict
+from typing import Any, Optional, Protocol, Union, runtime_checkable
+import joblib
 import numpy as np
 import pandas as pd
 import scipy
-from sklearn import metrics
+from scipy.integrate import cumulative_trapezoid
 from ..io import SessionCollection, Session, Signal
-from ..io.session import FieldList
+from ..io.session import FieldList, resolve_fields, select_fields
 
 PeakFilter = Union[None, float, tuple[Union[None, float], Union[None, float]]]
 
@@ -30,7 +32,12 @@ class PeakFilterProvider(Protocol):
 
 
 def measure_peaks(
-    sessions: SessionCollection, signal: str, include_meta: FieldList = "all", include_detection_params: bool = False, **kwargs
+    sessions: SessionCollection,
+    signal: str,
+    include_meta: FieldList = "all",
+    include_detection_params: bool = False,
+    n_jobs: Optional[int] = None,
+    **kwargs,
 ) -> pd.DataFrame:
     """Measure peaks within a signal.
 
@@ -39,7 +46,9 @@ def measure_peaks(
 
     These parameters are designed to not filter any peaks, but also provoke `scipy.signal.find_peaks()` into returning all peak measurement fields.
 
-    You may override any of these parameters to `scipy.signal.find_peaks()` via this functions `**kwargs`.
+    You may override any of these parameters to `scipy.signal.find_peaks()` via this functions `**kwargs`. Measuring peak widths is the most
+    costly of these, so if you do not need the width measurements, pass `width=None` to skip them entirely; the `widths`, `width_heights`,
+    `left_ips` and `right_ips` columns will then be absent from the results.
 
     Also allowed for any valid detection parameter is a callable (see `PeakFilterProvider` for signature) that is given the session, signal, trial index and trial
     data, and should return valid detection parameter values (i.e. None, float, or tuple of the preceding). The callable is evaluated for each observation in the
@@ -60,13 +69,15 @@ def measure_peaks(
     - widths: the width of the peak, as returned by `scipy.signal.find_peaks()`.
     - width_heights: The height of the contour lines at which the widths where evaluated, as returned by `scipy.signal.find_peaks()`..
     - left_ips, right_ips: Interpolated positions of left and right intersection points of a horizontal line at the respective evaluation height, as returned by `scipy.signal.find_peaks()`..
-    - auc: area under the curve of the given trial, as returned by `sklearn.metrics.auc()`
+    - auc: area under the curve between the peak's bases, computed with the trapezoidal rule
 
     Args:
         sessions: collection of sessions to work on
         signal: name of the signal to measure
         include_meta: metadata fields to include in the final output. Special string "all" will include all metadata fields
         include_detection_params: if True, include detection parameters as columns in the output dataframe
+        n_jobs: number of trials to measure concurrently, see `joblib.Parallel()`. Trials are measured on threads, so any
+            `PeakFilterProvider` callables should be safe to call concurrently. If None, trials are measured sequentially.
         **kwargs: additional kwargs to pass to `scipy.signal.find_peaks()`
 
     Returns:
@@ -84,52 +95,123 @@ def measure_peaks(
     # update the detection params with any the user provided.
     detection_params.update(**kwargs)
 
-    peak_data = []
-    for session in sessions:
-        # determine metadata fields to include
-        if include_meta == "all":
-            meta = session.metadata
-        else:
-            meta = {k: v for k, v in session.metadata.items() if k in include_meta}
+    keep_meta = resolve_fields(include_meta)
 
-        # fetch time and signal data
-        t = session.signals[signal].time
-        sig = np.atleast_2d(session.signals[signal].signal)
-        for i in range(sig.shape[0]):
-            # setup detection params for the current trial.
-            # the user could possibly provide us a callable to dynamically determine detection parameter values
-            current_detection_params = detection_params.copy()
-            for key in current_detection_params.keys():
-                param = current_detection_params[key]
-                if isinstance(param, PeakFilterProvider):
-                    current_detection_params[key] = param(session, session.signals[signal], i, sig[i, :])
-
-            # detect peaks
-            peaks, props = scipy.signal.find_peaks(sig[i, :], **current_detection_params)
-
-            # for each peak, prepare a "row" for the output dataframe
-            for peak_i in range(len(peaks)):
-                peak_slice = slice(props["left_bases"][peak_i], props["right_bases"][peak_i])
-                result = {
-                    **meta,
-                    "trial": i,
-                    "peak_num": peak_i,
-                    "peak_index": peaks[peak_i],
-                    "peak_time": t[peaks[peak_i]],
-                    **{k: v[peak_i] for k, v in props.items()},
-                    "auc": metrics.auc(t[peak_slice], sig[i, peak_slice]),
-                }
-
-                # include any detection params if the user requested that feature
-                if include_detection_params:
-                    result.update({f"param_{k}": v for k, v in current_detection_params.items()})
-
-                # collect the result
-                peak_data.append(result)
+    # view each session's data as (trials x samples) in a single C-ordered float64 buffer, so every trial is a contiguous row
+    # that `find_peaks()` can use as-is, rather than converting (ex. float32 TDT streams) to a fresh float64 copy per trial.
+    # Sessions are converted lazily, as their trials are dispatched, so only the buffers of sessions in flight are kept alive
+    session_signals = [(session, session.signals[signal]) for session in sessions]
+    trials = (
+        (session, sig_obj, i, trial)
+        for session, sig_obj in session_signals
+        for i, trial in enumerate(np.ascontiguousarray(sig_obj.signal.reshape(-1, sig_obj.signal.shape[-1]), dtype=np.float64))
+    )
+
+    if n_jobs is None:
+        # measure each trial as its results are assembled, avoiding the overhead of dispatching through joblib
+        results = (
+            _measure_peaks_trial(session, sig_obj, i, trial, include_detection_params, detection_params)
+            for session, sig_obj, i, trial in trials
+        )
+    else:
+        # trials are independent of one another, so measure all trials across all sessions as one batch of tasks
+        results = iter(
+            joblib.Parallel(n_jobs=n_jobs, prefer="threads")(
+                joblib.delayed(_measure_peaks_trial)(session, sig_obj, i, trial, include_detection_params, detection_params)
+                for session, sig_obj, i, trial in trials
+            )
+        )
+
+    # assemble the results for each session
+    session_frames = []
+    for session, sig_obj in session_signals:
+        # accumulate results column-wise, one array per trial for each column
+        columns: dict[str, list[np.ndarray]] = defaultdict(list)
+        for _ in range(sig_obj.nobs):
+            trial_columns = next(results)
+            if trial_columns is not None:
+                for k, v in trial_columns.items():
+                    columns[k].append(v)
+
+        if len(columns) == 0:
+            continue
+
+        # assemble the session results, broadcasting metadata across all the peaks found in this session
+        n_rows = sum(len(c) for c in columns["trial"])
+        frame_data: dict[str, Any] = {k: [v] * n_rows for k, v in select_fields(session.metadata, keep_meta).items()}
+        frame_data.update({k: np.concatenate(v) for k, v in columns.items()})
+        # all columns are freshly built arrays, so pandas may take ownership of them rather than copying
+        session_frames.append(pd.DataFrame(frame_data, copy=False))
 
     # convert results to a dataframe and return
-    peak_data = pd.DataFrame(peak_data)
-    return peak_data
+    if len(session_frames) == 0:
+        return pd.DataFrame()
+    return pd.concat(session_frames, ignore_index=True)
+
+
+def _measure_peaks_trial(
+    session: Session,
+    sig: Signal,
+    i: int,
+    trial: np.ndarray,
+    include_detection_params: bool,
+    detection_params: dict[str, Union[PeakFilter, PeakFilterProvider]],
+) -> Optional[dict[str, np.ndarray]]:
+    """Measure peaks within a single trial of a signal.
+
+    See `measure_peaks()` for details on the parameters and results.
+
+    Args:
+        session: the session the trial belongs to
+        sig: the signal being measured
+        i: index of the trial within the signal
+        trial: data for the trial
+        include_detection_params: if True, include detection parameters as columns in the output
+        detection_params: parameters for `scipy.signal.find_peaks()`
+
+    Returns:
+        dict of result columns for this trial, or None if no peaks were found.
+    """
+    t = sig.time
+    dx = 1.0 / sig.fs
+
+    # setup detection params for the current trial.
+    # the user could possibly provide us a callable to dynamically determine detection parameter values
+    current_detection_params = detection_params.copy()
+    for key in current_detection_params.keys():
+        param = current_detection_params[key]
+        if isinstance(param, PeakFilterProvider):
+            current_detection_params[key] = param(session, sig, i, trial)
+
+    # detect peaks
+    peaks, props = scipy.signal.find_peaks(trial, **current_detection_params)
+    n_peaks = len(peaks)
+    if n_peaks == 0:
+        return None
+
+    # samples are uniformly spaced, so integrate with a constant step rather than differencing the time axis
+    auc = cumulative_trapezoid(trial, dx=dx, initial=0)
+
+    # collect columns for all peaks in this trial at once, `find_peaks()` already gives us arrays of properties
+    columns: dict[str, np.ndarray] = {
+        "trial": np.full(n_peaks, i),
+        "peak_num": np.arange(n_peaks),
+        "peak_index": peaks,
+        "peak_time": t[peaks],
+        **props,
+        # integrate the trial once, so each peak's area between its bases is a difference of the running integral.
+        # matches `trapezoid(trial[lb:rb], dx=dx)`, as `find_peaks()` guarantees lb < peak <= rb - 1.
+        "auc": auc[props["right_bases"] - 1] - auc[props["left_bases"]],
+    }
+
+    # include any detection params if the user requested that feature
+    if include_detection_params:
+        for k, v in current_detection_params.items():
+            param_values = np.empty(n_peaks, dtype=object)
+            param_values.fill(v)
+            columns[f"param_{k}"] = param_values
+
+    return columns
 
 
 def detect_naive_peaks(
@@ -151,13 +233,11 @@ def detect_naive_peaks(
     Returns:
         pandas `DataFrame` with peak measurements.
     """
-    peak_data = []
+    keep_meta = resolve_fields(include_meta)
+    session_frames = []
     for session in sessions:
         # determine metadata fields to include
-        if include_meta == "all":
-            meta = session.metadata
-        else:
-            meta = {k: v for k, v in session.metadata.items() if k in include_meta}
+        meta = select_fields(session.metadata, keep_meta)
 
         # fetch time and signal data
         sig = session.signals[signal]
@@ -175,17 +255,24 @@ def detect_naive_peaks(
         else:
             raise ValueError("Invalid window specification")
 
-        for i in range(sig.nobs):
-            peak = np.argmax(sig.signal[i, _window[0] : _window[1]]) + _window[0]
-            result = {
-                **meta,
-                "trial": i,
-                "peak_index": peak,
-                "peak_time": sig.time[peak],
-                "peak_height": sig.signal[i, peak],
+        # find the maximum of every trial at once
+        data = np.atleast_2d(sig.signal)
+        peaks = np.argmax(data[:, _window[0] : _window[1]], axis=1) + _window[0]
+        trials = np.arange(data.shape[0])
+
+        n_rows = len(trials)
+        session_data: dict[str, Any] = {k: [v] * n_rows for k, v in meta.items()}
+        session_data.update(
+            {
+                "trial": trials,
+                "peak_index": peaks,
+                "peak_time": sig.time[peaks],
+                "peak_height": data[trials, peaks],
             }
-            peak_data.append(result)
+        )
+        session_frames.append(pd.DataFrame(session_data, copy=False))
 
     # convert results to a dataframe and return
-    peak_data = pd.DataFrame(peak_data)
-    return peak_data
+    if len(session_frames) == 0:
+        return pd.DataFrame()
+    return pd.concat(session_frames, ignore_index=True)
@@ -1,6 +1,5 @@
 from typing import Optional
 import numpy as np
-import scipy
 
 from fptools.io import Session, Signal
 from fptools.preprocess.lib import fs2t
@@ -22,28 +21,54 @@ def collect_signals(
     Returns:
         the collected Signal
     """
-    assert start < stop
+    return collect_signals_multi(session, event, signal, [(start, stop)], out_names=None if out_name is None else [out_name])[0]
+
+
+def collect_signals_multi(
+    session: Session, event: str, signal: str, windows: list[tuple[float, float]], out_names: Optional[list[str]] = None
+) -> list[Signal]:
+    """Collect a signal from a session around an event, for several collection intervals at once.
+
+    Equivalent to calling `collect_signals()` once for each interval in `windows`, but the event positions within the signal
+    are located only once and shared across all intervals.
+
+    Args:
+        session: the Session to operate on
+        event: the name of the event to use
+        signal: the name of the signal to collect
+        windows: list of (start, stop) collection intervals, in seconds, relative to each event. See `collect_signals()` for details
+        out_names: if not None, the names of the returned `Signal` objects, one for each interval. Otherwise, each new `Signal` object's name will be generated as `{signal}@{event}`
+
+    Returns:
+        list of collected Signals, one for each interval in `windows`
+    """
+    for start, stop in windows:
+        assert start < stop
+
+    if out_names is None:
+        out_names = [f"{signal}@{event}"] * len(windows)
+    assert len(out_names) == len(windows)
 
     sig = session.signals[signal]
     events = session.epocs[event]
 
-    n_samples = int(np.rint((stop - start) * sig.fs))
-    offset = int(np.rint(start * sig.fs))
-    new_time = fs2t(sig.fs, n_samples) + start
+    # sample counts and offsets (relative to each event) for each interval
+    n_samples = [int(np.rint((stop - start) * sig.fs)) for start, stop in windows]
+    offsets = [int(np.rint(start * sig.fs)) for start, _ in windows]
 
-    accum = np.zeros_like(sig.signal, shape=(events.shape[0], n_samples))
-    padding = abs(offset) + n_samples
-    padded_signal = np.pad(sig.signal, (padding, padding), mode="constant", constant_values=0)
-    for ei, evt in enumerate(events):
-        event_idx = sig.tindex(evt) + padding  # add padding
-        accum[ei, :] = padded_signal[(event_idx + offset) : (event_idx + offset + n_samples)]
+    event_idxs = sig.tindices(events)
 
-    if out_name is None:
-        out_name = f"{signal}@{event}"
+    collected = []
+    for (start, _), offset, n, name in zip(windows, offsets, n_samples, out_names):
+        # gather every event's window at once, with samples falling outside of the signal set to zero
+        idxs = (event_idxs + offset)[:, np.newaxis] + np.arange(n)
+        in_bounds = (idxs >= 0) & (idxs < sig.nsamples)
+        accum = np.where(in_bounds, sig.signal[np.clip(idxs, 0, sig.nsamples - 1)], 0)
+        s = Signal(name, accum, time=fs2t(sig.fs, n) + start, units=sig.units)
+        s.marks[event] = 0
+        collected.append(s)
 
-    s = Signal(out_name, accum, time=new_time, units=sig.units)
-    s.marks[event] = 0
-    return s
+    return collected
 
 
 def collect_signals_2event(
@@ -95,26 +120,24 @@ def collect_signals_2event(
     slice2 = slice(pre_idxs, pre_idxs + inter_idxs)
     slice3 = slice(pre_idxs + inter_idxs, pre_idxs + inter_idxs + post_idxs)
 
-    accum = np.zeros_like(sig.signal, shape=(events_1.shape[0], n_samples))
-    padded_signal = np.pad(sig.signal, (pre_idxs, post_idxs), mode="constant", constant_values=0)
-    for ei, (evt1, evt2) in enumerate(zip(events_1, events_2)):
-        event1_idx = sig.tindex(evt1)
-        event2_idx = sig.tindex(evt2)
+    # every paired event's row is fully written below (samples outside of the signal are zeroed by `_copy_window()`),
+    # so only rows left without a paired event2 need initializing
+    accum = np.empty_like(sig.signal, shape=(events_1.shape[0], n_samples))
+    accum[min(events_1.shape[0], events_2.shape[0]) :] = 0
+    for ei, (event1_idx, event2_idx) in enumerate(zip(sig.tindices(events_1), sig.tindices(events_2))):
 
         # collect the first third (pre to event1)
-        accum[ei, slice1] = padded_signal[event1_idx : (event1_idx + pre_idxs)]
+        _copy_window(sig.signal, event1_idx - pre_idxs, accum[ei, slice1])
 
         # collect the second third (event1 to event2)
-        # idea here is train a scipy.interpolate.interp1d() object with our real data
-        # and then resample `inter_idxs` number of points from `inter_time`
+        # idea here is to linearly interpolate our real data, resampling `inter_idxs` number of points from `inter_time`
         inter_time = sig.time[event1_idx:event2_idx]
-        inter_sig = padded_signal[(event1_idx + pre_idxs) : (event2_idx + pre_idxs)]
-        inter_source_intp = scipy.interpolate.interp1d(inter_time, inter_sig)
+        inter_sig = sig.signal[event1_idx:event2_idx]
         inter_time_query = np.linspace(inter_time[0], inter_time[-1], inter_idxs, endpoint=True)
-        accum[ei, slice2] = inter_source_intp(inter_time_query)
+        accum[ei, slice2] = np.interp(inter_time_query, inter_time, inter_sig)
 
         # collect the final third (event 2 to post)
-        accum[ei, slice3] = padded_signal[(event2_idx + pre_idxs) : (event2_idx + pre_idxs + post_idxs)]
+        _copy_window(sig.signal, event2_idx, accum[ei, slice3])
 
     # construct the new signal object, and copy over proper metadata and add marks
     if out_name is None:
@@ -128,6 +151,26 @@ def collect_signals_2event(
     return s
 
 
+def _copy_window(signal: np.ndarray, start: int, out: np.ndarray) -> None:
+    """Copy `len(out)` samples of `signal`, beginning at index `start`, into `out`.
+
+    Only the portion of the window which falls within `signal` is copied; elements of `out` outside of `signal` are set to zero.
+
+    Args:
+        signal: 1D array to copy from
+        start: index into `signal` of the first sample of the window, may be negative
+        out: 1D array to copy into
+    """
+    src_lo = min(max(start, 0), signal.shape[0])
+    src_hi = max(min(start + out.shape[0], signal.shape[0]), src_lo)
+    dst_lo = src_lo - start
+    dst_hi = src_hi - start
+    out[dst_lo:dst_hi] = signal[src_lo:src_hi]
+    # only windows overhanging the ends of the signal need any zeroing
+    out[:dst_lo] = 0
+    out[dst_hi:] = 0
+
+
 # def collect_signals_2event2(
 #     session: Session,
 #     event1: str,
@@ -1,13 +1,16 @@
-from typing import Union, cast
-from fptools.io import SessionCollection
+from typing import Optional, Union, cast
+from fptools.io import Session, SessionCollection
+import joblib
 import numpy as np
 import pandas as pd
 
-from .signal_collector import collect_signals
-from ..io.session import FieldList
+from .signal_collector import collect_signals_multi
+from ..io.session import FieldList, resolve_fields, select_fields
 
 
-def measure_snr_overall(sessions: SessionCollection, signals: Union[str, list[str]], include_meta: FieldList = "all") -> pd.DataFrame:
+def measure_snr_overall(
+    sessions: SessionCollection, signals: Union[str, list[str]], include_meta: FieldList = "all", n_jobs: Optional[int] = None
+) -> pd.DataFrame:
     """Measure Signal to Noise ratio (SNR) of the overall stream.
 
     SNR defined as log10(mean(signal)^2 / std(signal)^2), and expressed in decibels (dB)
@@ -16,6 +19,7 @@ def measure_snr_overall(sessions: SessionCollection, signals: Union[str, list[st
         sessions: sessions to pull signals from
         signals: one or more signal names to operate on"
         include_meta: metadata fields to include in the resulting dataframe. If "all", include all metadata fields
+        n_jobs: number of sessions to measure concurrently (on threads), see `joblib.Parallel()`. If None, sessions are measured sequentially.
 
     Returns:
         pandas.DataFrame with calculated SNR
@@ -26,24 +30,45 @@ def measure_snr_overall(sessions: SessionCollection, signals: Union[str, list[st
     else:
         sigs_to_measure.extend(signals)
 
-    data = []
-    for session in sessions:
-        # determine metadata fields to include
-        if include_meta == "all":
-            meta = session.metadata
+    keep_meta = resolve_fields(include_meta)
+    if n_jobs is None:
+        # measuring a session is cheap, avoid the overhead of dispatching through joblib
+        results = [_measure_snr_overall_session(session, sigs_to_measure, keep_meta) for session in sessions]
+    else:
+        results = joblib.Parallel(n_jobs=n_jobs, prefer="threads")(
+            joblib.delayed(_measure_snr_overall_session)(session, sigs_to_measure, keep_meta) for session in sessions
+        )
+    return _concat_results(results)
+
+
+def _measure_snr_overall_session(session: Session, sigs_to_measure: list[str], keep_meta: Optional[frozenset[str]]) -> pd.DataFrame:
+    """Measure Signal to Noise ratio (SNR) of the overall stream for a single session.
+
+    See `measure_snr_overall()` for details on the parameters and results.
+
+    Returns:
+        pandas.DataFrame with one row for each signal
+    """
+    # determine metadata fields to include
+    meta = select_fields(session.metadata, keep_meta)
+
+    snr = np.empty(len(sigs_to_measure), dtype=float)
+    for i, sig_name in enumerate(sigs_to_measure):
+        # mean and variance from a single set of deviations. Calling `np.mean()` and `np.std()` separately makes five passes
+        # over the signal (std recomputes the mean); this makes three. Single precision signals (ex. TDT streams) keep their
+        # deviations in float32 to halve memory traffic, but are summed in double precision since `np.dot()` would not be.
+        data = session.signals[sig_name].signal.ravel()
+        mean = np.mean(data, dtype=np.float64)
+        if data.dtype == np.float32:
+            dev = np.subtract(data, mean, dtype=np.float32)
+            np.square(dev, out=dev)
+            var = np.sum(dev, dtype=np.float64) / dev.size
         else:
-            meta = {k: v for k, v in session.metadata.items() if k in include_meta}
+            dev = data - mean
+            var = np.dot(dev, dev) / dev.size
+        snr[i] = np.log10(mean**2 / var)
 
-        for sig_name in sigs_to_measure:
-            sig = session.signals[sig_name]
-            data.append(
-                {
-                    **meta,
-                    "signal": sig_name,
-                    "snr": np.log10(np.power(np.mean(sig.signal), 2) / np.power(np.std(sig.signal), 2)),
-                }
-            )
-    return pd.DataFrame(data)
+    return _session_frame(meta, {"signal": list(sigs_to_measure), "snr": snr})
 
 
 def measure_snr_event(
@@ -53,6 +78,7 @@ def measure_snr_event(
     noise_range: Union[tuple[float, float], list[tuple[float, float]]],
     signal_range: Union[tuple[float, float], list[tuple[float, float]]],
     include_meta: FieldList = "all",
+    n_jobs: Optional[int] = None,
 ) -> pd.DataFrame:
     """Measure Signal to Noise ratio (SNR) in signals surrounding events.
 
@@ -62,6 +88,7 @@ def measure_snr_event(
         noise_range: tuple(s) of start/stop times relative to the event to consider as noise
         signal_range: tuple(s) of start/stop times relative to the event to consider as signal
         include_meta: metadata fields to include in output. if "all" then all fields will be included
+        n_jobs: number of sessions to measure concurrently (on threads), see `joblib.Parallel()`. If None, sessions are measured sequentially.
 
     Returns:
         pandas.DataFrame with collected SNR data
@@ -78,35 +105,89 @@ def measure_snr_event(
     else:
         events_to_measure.extend(events)
 
-    nrs: list[tuple[float, float]] = []
-    if len(np.array(noise_range).shape) == 1:
-        nrs = [cast(tuple, noise_range)] * len(events_to_measure)
-    else:
-        nrs.extend(cast(list, noise_range))
+    nrs = _broadcast_range(noise_range, len(events_to_measure))
+    srs = _broadcast_range(signal_range, len(events_to_measure))
 
-    srs: list[tuple[float, float]] = []
-    if len(np.array(signal_range).shape) == 1:
-        srs = [cast(tuple, signal_range)] * len(events_to_measure)
+    keep_meta = resolve_fields(include_meta)
+    if n_jobs is None:
+        # measuring a session is cheap, avoid the overhead of dispatching through joblib
+        results = [_measure_snr_event_session(session, sigs_to_measure, events_to_measure, nrs, srs, keep_meta) for session in sessions]
     else:
-        srs.extend(cast(list, signal_range))
+        results = joblib.Parallel(n_jobs=n_jobs, prefer="threads")(
+            joblib.delayed(_measure_snr_event_session)(session, sigs_to_measure, events_to_measure, nrs, srs, keep_meta)
+            for session in sessions
+        )
+    return _concat_results(results)
 
-    data = []
-    for session in sessions:
-        # determine metadata fields to include
-        if include_meta == "all":
-            meta = session.metadata
-        else:
-            meta = {k: v for k, v in session.metadata.items() if k in include_meta}
-
-        for sig_name in sigs_to_measure:
-            for ei, event_name in enumerate(events_to_measure):
-                n = collect_signals(session, event_name, sig_name, start=nrs[ei][0], stop=nrs[ei][1])
-                s = collect_signals(session, event_name, sig_name, start=srs[ei][0], stop=srs[ei][1])
-                data.append(
-                    {
-                        **meta,
-                        "signal": sig_name,
-                        "snr": np.median((s.signal.max(axis=1) - s.signal.min(axis=1)) ** 2 / n.signal.std(axis=1) ** 2),
-                    }
-                )
-    return pd.DataFrame(data)
+
+def _broadcast_range(time_range: Union[tuple[float, float], list[tuple[float, float]]], n_events: int) -> list[tuple[float, float]]:
+    """Normalize a time range specification to one range per event.
+
+    Args:
+        time_range: a single tuple of start/stop times, applied to every event, or a list of such tuples, one per event
+        n_events: number of events being measured
+
+    Returns:
+        list of start/stop time tuples, one per event
+    """
+    if np.isscalar(time_range[0]):
+        return [cast(tuple, time_range)] * n_events
+    return list(cast(list, time_range))
+
+
+def _measure_snr_event_session(
+    session: Session,
+    sigs_to_measure: list[str],
+    events_to_measure: list[str],
+    nrs: list[tuple[float, float]],
+    srs: list[tuple[float, float]],
+    keep_meta: Optional[frozenset[str]],
+) -> pd.DataFrame:
+    """Measure Signal to Noise ratio (SNR) in signals surrounding events for a single session.
+
+    See `measure_snr_event()` for details on the parameters and results.
+
+    Returns:
+        pandas.DataFrame with one row for each signal and event
+    """
+    # determine metadata fields to include
+    meta = select_fields(session.metadata, keep_meta)
+
+    signal_names = [sig_name for sig_name in sigs_to_measure for _ in events_to_measure]
+    snr = np.empty(len(signal_names), dtype=float)
+    i = 0
+    for sig_name in sigs_to_measure:
+        for ei, event_name in enumerate(events_to_measure):
+            n, s = collect_signals_multi(session, event_name, sig_name, [nrs[ei], srs[ei]])
+            snr[i] = np.median(np.ptp(s.signal, axis=1) ** 2 / n.signal.var(axis=1))
+            i += 1
+
+    return _session_frame(meta, {"signal": signal_names, "snr": snr})
+
+
+def _session_frame(meta: dict, columns: dict) -> pd.DataFrame:
+    """Assemble a session's results column-wise, broadcasting the session metadata across every row.
+
+    Args:
+        meta: metadata fields to include, each repeated for every row
+        columns: result columns, each of the same length
+
+    Returns:
+        pandas.DataFrame with metadata columns followed by the result columns
+    """
+    nrows = len(columns["signal"])
+    return pd.DataFrame({**{k: [v] * nrows for k, v in meta.items()}, **columns}, copy=False)
+
+
+def _concat_results(results: list[pd.DataFrame]) -> pd.DataFrame:
+    """Concatenate per-session results, filling metadata fields missing from some sessions with NaN.
+
+    Args:
+        results: per-session result frames
+
+    Returns:
+        pandas.DataFrame containing all results
+    """
+    if len(results) == 0:
+        return pd.DataFrame()
+    return pd.concat(results, ignore_index=True)
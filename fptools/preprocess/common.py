@@ -1,9 +1,9 @@
 from abc import ABC, abstractmethod
 import os
-from typing import Literal, Optional, Protocol, Union
+from typing import Literal, Optional, Protocol, Sequence, Union
 
-from matplotlib import pyplot as plt
 from matplotlib.axes import Axes
+from matplotlib.figure import Figure
 
 from fptools.io import Session
 
@@ -60,16 +60,28 @@ class ProcessorThatPlots(Processor):
         raise NotImplementedError()
 
 
+_SAVEFIG_KWARGS: dict[str, dict] = {"png": {"dpi": 300}}
+"""Additional keyword arguments passed to `Figure.savefig()` when saving pipeline plots, keyed by file format."""
+
+
 class Pipeline(Processor):
     """A pipeline of Processors, and is itself a Processor."""
 
-    def __init__(self, steps: Optional[list[Processor]] = None, plot: bool = True, plot_dir: Optional[str] = None):
+    def __init__(
+        self,
+        steps: Optional[list[Processor]] = None,
+        plot: bool = True,
+        plot_dir: Optional[str] = None,
+        plot_formats: Sequence[str] = ("png", "pdf"),
+    ):
         """Initialize this pipeline.
 
         Args:
             steps: list of Processors to run on a given Session
             plot: whether to plot the results of each step
             plot_dir: directory to save plots to, if None, will save to current working directory
+            plot_formats: file formats (as file extensions) to save plots as. Each format renders the full figure again, so saving only
+                the formats you need can substantially reduce the time spent plotting long signals.
         """
         self.steps: list[Processor]
         if steps is None:
@@ -79,6 +91,7 @@ class Pipeline(Processor):
 
         self.plot: bool = plot
         self.plot_dir: str = plot_dir or os.getcwd()
+        self.plot_formats: Sequence[str] = plot_formats
 
     def __call__(self, session: Session) -> Session:
         """Run this pipeline on a Session.
@@ -93,7 +106,9 @@ class Pipeline(Processor):
             if self.plot:
                 # allocate a plot:
                 # - each step receives one row to plot on
-                fig, axs = plt.subplots(len(self.steps), 1, figsize=(24, 6 * len(self.steps)))
+                # use the object-oriented interface rather than pyplot, so pipelines may safely run concurrently on multiple threads
+                fig = Figure(figsize=(24, 6 * len(self.steps)))
+                axs = fig.subplots(len(self.steps), 1, squeeze=False)[:, 0]
 
             for i, step in enumerate(self.steps):
                 session = step(session)
@@ -119,6 +134,5 @@ class Pipeline(Processor):
             raise
         finally:
             if self.plot:
-                fig.savefig(os.path.join(self.plot_dir, f"{session.name}.png"), dpi=300)
-                fig.savefig(os.path.join(self.plot_dir, f"{session.name}.pdf"))
-                plt.close(fig)
+                for plot_format in self.plot_formats:
+                    fig.savefig(os.path.join(self.plot_dir, f"{session.name}.{plot_format}"), **_SAVEFIG_KWARGS.get(plot_format, {}))
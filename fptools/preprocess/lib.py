@@ -1,7 +1,10 @@
 from typing import Optional, Union
+import functools
+import joblib
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 import scipy
-import scipy.stats
+import scipy.optimize
 import scipy.signal
 
 
@@ -15,7 +18,7 @@ def fs2t(fs: float, length: int) -> np.ndarray:
     Returns
         array of time values, in seconds
     """
-    return np.linspace(1, length, length) / fs
+    return np.arange(1, length + 1, dtype=np.float64) / fs
 
 
 def t2fs(time: np.ndarray) -> float:
@@ -30,19 +33,39 @@ def t2fs(time: np.ndarray) -> float:
     return 1 / np.median(np.diff(time))
 
 
-def lowpass_filter(signal: np.ndarray, fs: float, Wn: float = 10) -> np.ndarray:
+def lowpass_filter(signal: np.ndarray, fs: float, Wn: float = 10, padlen: Optional[int] = None) -> np.ndarray:
     """zero-phase lowpass filter a signal.
 
+    Filtering is applied along the last axis. All observations of a multidimensional `signal` are filtered together in a single
+    call into scipy, so there is no need to filter observations one at a time.
+
     Args:
-        signal: array to be filtered
+        signal: array to be filtered, of shape (..., n_samples)
         fs: sampling frequency of the signal, in Hz
         Wn: critical frequency, see `scipy.signal.butter()`
+        padlen: number of samples to extend the signal by at each end prior to filtering, see `scipy.signal.sosfiltfilt()`. If None, use
+            scipy's default. Short signals (ex. windows around events) may need a smaller value, or 0 to disable padding.
 
     Returns:
         lowpass filtered signal
     """
-    b, a = scipy.signal.butter(2, Wn, btype="lowpass", fs=fs)
-    return scipy.signal.filtfilt(b, a, signal, axis=-1)
+    return scipy.signal.sosfiltfilt(_butter_lowpass_sos(Wn, fs), signal, axis=-1, padlen=padlen)
+
+
+@functools.lru_cache(maxsize=32)
+def _butter_lowpass_sos(Wn: float, fs: float) -> np.ndarray:
+    """Design a 2nd order butterworth lowpass filter as second-order sections.
+
+    Sessions typically share a sampling rate, so the design is cached rather than repeated for every signal filtered.
+
+    Args:
+        Wn: critical frequency, see `scipy.signal.butter()`
+        fs: sampling frequency, in Hz
+
+    Returns:
+        filter coefficients as second-order sections, see `scipy.signal.sosfiltfilt()`
+    """
+    return scipy.signal.butter(2, Wn, btype="lowpass", fs=fs, output="sos")
 
 
 def double_exponential(t: np.ndarray, const: float, amp_fast: float, amp_slow: float, tau_slow: float, tau_multiplier: float) -> np.ndarray:
@@ -63,38 +86,99 @@ def double_exponential(t: np.ndarray, const: float, amp_fast: float, amp_slow: f
     return const + amp_slow * np.exp(-t / tau_slow) + amp_fast * np.exp(-t / tau_fast)
 
 
-def fit_double_exponential(time: np.ndarray, signal: np.ndarray) -> np.ndarray:
+def _double_exponential_jacobian(
+    t: np.ndarray, const: float, amp_fast: float, amp_slow: float, tau_slow: float, tau_multiplier: float
+) -> np.ndarray:
+    """Compute the jacobian of `double_exponential()` with respect to its parameters.
+
+    Providing this to `scipy.optimize.curve_fit()` spares it from estimating the jacobian by finite differences, which costs one
+    extra evaluation of `double_exponential()` per parameter on every iteration.
+
+    Args:
+        t: Time vector in seconds.
+        const: Amplitude of the constant offset.
+        amp_fast: Amplitude of the fast component.
+        amp_slow: Amplitude of the slow component.
+        tau_slow: Time constant of slow component in seconds.
+        tau_multiplier: Time constant of fast component relative to slow.
+
+    Returns:
+        array of shape (len(t), 5), partial derivatives with respect to each parameter, in the order of the parameters above.
+    """
+    tau_fast = tau_slow * tau_multiplier
+    exp_slow = np.exp(-t / tau_slow)
+    exp_fast = np.exp(-t / tau_fast)
+    # derivative of the fast component with respect to tau_fast, scaled by tau_fast
+    fast_term = amp_fast * exp_fast * t / tau_fast
+    return np.stack(
+        [np.ones_like(t), exp_fast, exp_slow, (amp_slow * exp_slow * t / tau_slow + fast_term) / tau_slow, fast_term / tau_multiplier],
+        axis=-1,
+    )
+
+
+def fit_double_exponential(
+    time: np.ndarray, signal: np.ndarray, n_jobs: Optional[int] = None, max_fit_samples: Optional[int] = None
+) -> np.ndarray:
     """Run the fitting procedure for a double exponential curve.
 
     Args:
         time: array of sample times
         signal: array of sample values
+        n_jobs: for 2D signals, number of rows to fit concurrently (on threads), see `joblib.Parallel()`. If None, rows are fit sequentially.
+        max_fit_samples: if not None, fit the curve to at most approximately this many evenly spaced samples, rather than every sample.
+            Photobleaching trends are slow, so a few thousand samples usually describe them as well as the full recording, at a fraction
+            of the cost. The fitted curve is always evaluated at every time in `time`. If None, every sample is used for fitting.
 
     Returns:
         array of values from the fitted double exponential curve, samples at the times in `time`.
     """
+    # stride through the samples used for fitting, if requested. Rounding the stride up keeps within `max_fit_samples`
+    if max_fit_samples is None:
+        stride = 1
+    elif max_fit_samples < 1:
+        raise ValueError(f"`max_fit_samples` must be at least 1, got {max_fit_samples}")
+    else:
+        stride = max(1, -(-time.shape[-1] // max_fit_samples))
+    fit_time = time[::stride]
+
     if signal.ndim == 2:
         max_sig = np.max(signal)
         initial_params = [max_sig / 2, max_sig / 4, max_sig / 4, 3600, 0.1]
         bounds = ([0, 0, 0, 600, 0], [max_sig, max_sig, max_sig, 36000, 1])
 
-        parm_opt = np.zeros_like(signal, shape=(signal.shape[0], len(initial_params)))
-        for i, sig_row in enumerate(signal):
-            parm_opt[i], _ = scipy.optimize.curve_fit(double_exponential, time, sig_row, p0=initial_params, bounds=bounds, maxfev=1000)
-        return np.array([double_exponential(time, *p) for p in parm_opt])
+        # each row is fit independently of the others
+        fits = joblib.Parallel(n_jobs=n_jobs, prefer="threads")(
+            joblib.delayed(scipy.optimize.curve_fit)(
+                double_exponential,
+                fit_time,
+                sig_row[::stride],
+                p0=initial_params,
+                bounds=bounds,
+                maxfev=1000,
+                jac=_double_exponential_jacobian,
+            )
+            for sig_row in signal
+        )
+        parm_opt = np.array([popt for popt, _ in fits])
+        # evaluate all the fitted curves at once, broadcasting each parameter as a column against `time`
+        return double_exponential(time, *parm_opt.T[:, :, np.newaxis])
 
     elif signal.ndim == 1:
         max_sig = np.max(signal)
         initial_params = [max_sig / 2, max_sig / 4, max_sig / 4, 3600, 0.1]
         bounds = ([0, 0, 0, 600, 0], [max_sig, max_sig, max_sig, 36000, 1])
-        parm_opt, _ = scipy.optimize.curve_fit(double_exponential, time, signal, p0=initial_params, bounds=bounds, maxfev=1000)
+        parm_opt, _ = scipy.optimize.curve_fit(
+            double_exponential, fit_time, signal[::stride], p0=initial_params, bounds=bounds, maxfev=1000, jac=_double_exponential_jacobian
+        )
         return double_exponential(time, *parm_opt)
 
     else:
         raise ValueError("signal must be 1D or 2D")
 
 
-def detrend_double_exponential(time: np.ndarray, signal: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+def detrend_double_exponential(
+    time: np.ndarray, signal: np.ndarray, n_jobs: Optional[int] = None, max_fit_samples: Optional[int] = None
+) -> tuple[np.ndarray, np.ndarray]:
     """Detrend a signal by fitting and subtracting a double exponential curve to the data.
 
     See `double_exponential` for the underlying curve design, and `fit_double_exponential` for the curve fitting procedure.
@@ -102,11 +186,13 @@ def detrend_double_exponential(time: np.ndarray, signal: np.ndarray) -> tuple[np
     Args:
         time: array of sample/observation times
         signal: array of samples
+        n_jobs: for 2D signals, number of rows to fit concurrently, see `fit_double_exponential()`
+        max_fit_samples: if not None, approximate number of samples to fit the curve to, see `fit_double_exponential()`
 
     Returns:
         Tuple of (detrended_signal, signal_fit)
     """
-    signal_fit = fit_double_exponential(time, signal)
+    signal_fit = fit_double_exponential(time, signal, n_jobs=n_jobs, max_fit_samples=max_fit_samples)
     return signal - signal_fit, signal_fit
 
 
@@ -123,28 +209,33 @@ def estimate_motion(signal: np.ndarray, control: np.ndarray) -> tuple[np.ndarray
         tuple of (corrected_signal, estimated_motion)
     """
     assert signal.shape == control.shape, "signal and control must have same shapes"
-    if signal.ndim == 2:
-        slopes = np.zeros_like(signal, shape=(signal.shape[0], 1))
-        intercepts = np.zeros_like(signal, shape=(signal.shape[0], 1))
-        for i, (signal_row, control_row) in enumerate(zip(signal, control)):
-            slopes[i], intercepts[i], _, _, _ = scipy.stats.linregress(x=control_row, y=signal_row)
+    if signal.ndim not in (1, 2):
+        raise ValueError("signal must be 1D or 2D")
 
-        est_motion = slopes * (control) + intercepts
-        return signal - est_motion, est_motion
+    # closed-form least squares fit of every row at once, rather than calling `scipy.stats.linregress()` per row
+    # and discarding the statistics it computes in addition to slope and intercept
+    x = np.atleast_2d(control)
+    y = np.atleast_2d(signal)
+    x_mean = x.mean(axis=-1, keepdims=True, dtype=np.float64)
+    y_mean = y.mean(axis=-1, keepdims=True, dtype=np.float64)
+    x_dev = x - x_mean
+    y_dev = y - y_mean
+    slopes = np.einsum("ij,ij->i", x_dev, y_dev)[:, np.newaxis] / np.einsum("ij,ij->i", x_dev, x_dev)[:, np.newaxis]
+    intercepts = y_mean - slopes * x_mean
 
-    elif signal.ndim == 1:
-        slope, intercept, _, _, _ = scipy.stats.linregress(x=control, y=signal)
-        est_motion = slope * control + intercept
-        return signal - est_motion, est_motion
+    # fit parameters take on the precision of the signal, so the results do as well
+    param_dtype = np.result_type(signal.dtype, np.float32)
+    slopes = slopes.astype(param_dtype).reshape(signal.shape[:-1] + (1,))
+    intercepts = intercepts.astype(param_dtype).reshape(signal.shape[:-1] + (1,))
 
-    else:
-        raise ValueError("signal must be 1D or 2D")
+    est_motion = np.multiply(slopes, control)
+    est_motion += intercepts
+    return signal - est_motion, est_motion
 
 
 def are_arrays_same_length(*arrays: np.ndarray) -> bool:
     """Check if all arrays are the same shape in the last axis."""
-    lengths = [arr.shape[-1] for arr in arrays]
-    return bool(np.all(np.array(lengths) == lengths[0]))
+    return all(arr.shape[-1] == arrays[0].shape[-1] for arr in arrays)
 
 
 def downsample(*signals: np.ndarray, window: int = 10, factor: int = 10) -> tuple[np.ndarray, ...]:
@@ -161,9 +252,8 @@ def downsample(*signals: np.ndarray, window: int = 10, factor: int = 10) -> tupl
     Returns:
         downsampled signal(s)
     """
-    return tuple(
-        np.apply_along_axis(np.convolve, axis=-1, arr=sig, v=np.ones(window) / window, mode="valid")[..., ::factor] for sig in signals
-    )
+    # only every `factor`-th window is kept, so average just those windows (of every row at once) rather than convolving the whole signal
+    return tuple(sliding_window_view(sig, window, axis=-1)[..., ::factor, :].mean(axis=-1, dtype=np.float64) for sig in signals)
 
 
 def trim(*signals: np.ndarray, begin: Optional[int] = None, end: Optional[int] = None) -> tuple[np.ndarray, ...]:
@@ -206,11 +296,16 @@ def zscore(data: np.ndarray, mu: Optional[Union[float, np.ndarray]] = None, sigm
     """
     if mu is None:
         mu = data.mean(axis=-1, keepdims=True)
+        deviations = np.subtract(data, mu)
+        if sigma is None:
+            # same as `data.std()`, but reuses the deviations from the mean rather than computing them a second time
+            sigma = np.sqrt(np.square(deviations).mean(axis=-1, keepdims=True))
+    else:
+        deviations = np.subtract(data, mu)
+        if sigma is None:
+            sigma = data.std(axis=-1, keepdims=True)
 
-    if sigma is None:
-        sigma = data.std(axis=-1, keepdims=True)
-
-    return (data - mu) / sigma
+    return _scale_deviations(deviations, sigma)
 
 
 def mad(data: np.ndarray) -> np.ndarray:
@@ -222,7 +317,25 @@ def mad(data: np.ndarray) -> np.ndarray:
     Returns:
         The MAD of the data.
     """
-    return np.median(np.absolute(data - np.median(data, axis=-1, keepdims=True)), axis=-1, keepdims=True)
+    # medians along the last axis are much slower when rows are strided through memory (ex. Fortran ordered `DataFrame.values`)
+    data = np.ascontiguousarray(data)
+    return _mad(data, np.median(data, axis=-1, keepdims=True))
+
+
+def _mad(data: np.ndarray, median: np.ndarray) -> np.ndarray:
+    """Calculate the Median Absolute Deviation (MAD) of a dataset, given its already computed median.
+
+    Args:
+        data: A list or NumPy array of numerical data.
+        median: median of `data` along the last axis, with dimensions kept
+
+    Returns:
+        The MAD of the data.
+    """
+    deviations = np.subtract(data, median)
+    np.absolute(deviations, out=deviations)
+    # the deviations are our own temporary, so let `np.median()` partition them in place rather than copying them first
+    return np.median(deviations, axis=-1, keepdims=True, overwrite_input=True)
 
 
 def madscore(
@@ -238,13 +351,16 @@ def madscore(
     Returns:
         The MAD score of the data.
     """
+    data = np.ascontiguousarray(data)  # contiguous rows, see `mad()`
+    # the median is needed for both the default center and the default scale, so compute it only once
+    median = np.median(data, axis=-1, keepdims=True) if mu is None or sigma is None else None
     if mu is None:
-        mu = np.median(data, axis=-1, keepdims=True)
+        mu = median
 
     if sigma is None:
-        sigma = mad(data)
+        sigma = _mad(data, median)
 
-    return (data - mu) / sigma
+    return _scale_deviations(np.subtract(data, mu), sigma)
 
 
 def modified_zscore(
@@ -260,10 +376,30 @@ def modified_zscore(
     Returns:
         The modified z-score of the data.
     """
+    data = np.ascontiguousarray(data)  # contiguous rows, see `mad()`
+    # the median is needed for both the default center and the default scale, so compute it only once
+    median = np.median(data, axis=-1, keepdims=True) if mu is None or sigma is None else None
     if mu is None:
-        mu = np.median(data, axis=-1, keepdims=True)
+        mu = median
 
     if sigma is None:
-        sigma = mad(data)
+        sigma = _mad(data, median)
+
+    return _scale_deviations(np.subtract(data, mu), sigma, factor=0.6745)
 
-    return 0.6745 * (data - mu) / sigma
+
+def _scale_deviations(deviations: np.ndarray, sigma: Union[float, np.ndarray], factor: Optional[float] = None) -> np.ndarray:
+    """Compute `factor * deviations / sigma`, reusing the buffer of `deviations` for the result when the result dtype allows.
+
+    Args:
+        deviations: deviations of the data from its central value. May be overwritten!
+        sigma: scale value to divide the deviations by
+        factor: if not None, constant to multiply the deviations by prior to scaling
+
+    Returns:
+        the scaled deviations
+    """
+    in_place = deviations.dtype.kind == "f" and np.result_type(deviations, sigma) == deviations.dtype
+    if factor is not None:
+        deviations = np.multiply(factor, deviations, out=deviations if in_place else None)
+    return np.divide(deviations, sigma, out=deviations if in_place else None)
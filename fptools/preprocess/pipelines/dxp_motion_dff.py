@@ -1,4 +1,4 @@
-from typing import Literal, Optional, Union
+from typing import Literal, Optional, Sequence, Union
 
 from ..common import Pipeline, PairedSignalList, Processor, _flatten_paired_signals, _remap_paired_signals
 from ..steps import Dff, Downsample, TrimSignals, DblExpFit, MotionCorrect, Rename
@@ -27,6 +27,8 @@ class DxpMotionDffPipeline(Pipeline):
         downsample: Optional[int] = 10,
         plot: bool = True,
         plot_dir: Optional[str] = None,
+        plot_formats: Sequence[str] = ("png", "pdf"),
+        n_jobs: Optional[int] = None,
     ):
         """Initialize this pipeline.
 
@@ -38,6 +40,8 @@ class DxpMotionDffPipeline(Pipeline):
             downsample: if not `None`, downsample signal by `downsample` factor.
             plot: whether to plot the results of each step
             plot_dir: directory to save plots to
+            plot_formats: file formats (as file extensions) to save plots as, see `Pipeline`
+            n_jobs: number of signals to fit concurrently during detrending, see `DblExpFit`. If None, signals are fit sequentially.
         """
         steps: list[Processor] = []
 
@@ -58,7 +62,7 @@ class DxpMotionDffPipeline(Pipeline):
 
         steps.extend(
             [
-                DblExpFit(_flatten_paired_signals(signals), apply=True),
+                DblExpFit(_flatten_paired_signals(signals), apply=True, n_jobs=n_jobs),
                 MotionCorrect(signals),
                 Dff([(s, f"{s}_dxpfit") for s in _flatten_paired_signals(signals)], center=False),
             ]
@@ -68,7 +72,7 @@ class DxpMotionDffPipeline(Pipeline):
         if downsample is not None:
             steps.append(Downsample(_flatten_paired_signals(signals), window=downsample, factor=downsample))
 
-        super().__init__(steps=steps, plot=plot, plot_dir=plot_dir)
+        super().__init__(steps=steps, plot=plot, plot_dir=plot_dir, plot_formats=plot_formats)
 
 
 # def dxp_motion_dff(
@@ -1,4 +1,4 @@
-from typing import Literal, Optional, Union
+from typing import Literal, Optional, Sequence, Union
 
 from ..steps import Downsample, Lowpass, TrimSignals, Dff, Rename
 from ..common import Pipeline, Processor, SignalList, _remap_signals
@@ -27,6 +27,7 @@ class LowpassDFFPipeline(Pipeline):
         downsample: Optional[int] = 10,
         plot: bool = True,
         plot_dir: Optional[str] = None,
+        plot_formats: Sequence[str] = ("png", "pdf"),
     ):
         """Initialize this pipeline.
 
@@ -38,6 +39,7 @@ class LowpassDFFPipeline(Pipeline):
             downsample: if not `None`, downsample signal by `downsample` factor.
             plot: whether to plot the results of each step
             plot_dir: directory to save plots to
+            plot_formats: file formats (as file extensions) to save plots as, see `Pipeline`
         """
         steps: list[Processor] = []
 
@@ -62,7 +64,7 @@ class LowpassDFFPipeline(Pipeline):
         if downsample is not None:
             steps.append(Downsample(signals, window=downsample, factor=downsample))
 
-        super().__init__(steps=steps, plot=plot, plot_dir=plot_dir)
+        super().__init__(steps=steps, plot=plot, plot_dir=plot_dir, plot_formats=plot_formats)
 
 
 # def lowpass_dff(
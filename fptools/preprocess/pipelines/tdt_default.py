@@ -1,4 +1,4 @@
-from typing import Any, Literal, Optional, Union
+from typing import Any, Literal, Optional, Sequence, Union
 
 from ..steps import Downsample, Rename, TrimSignals, MotionCorrect, Dff
 from ..common import Pipeline, PairedSignalList, Processor, _flatten_paired_signals, _remap_paired_signals
@@ -26,6 +26,7 @@ class TdtDefaultPipeline(Pipeline):
         downsample: Optional[int] = 10,
         plot: bool = True,
         plot_dir: Optional[str] = None,
+        plot_formats: Sequence[str] = ("png", "pdf"),
     ):
         """Initialize this pipeline.
 
@@ -37,6 +38,7 @@ class TdtDefaultPipeline(Pipeline):
             downsample: if not `None`, downsample signal by `downsample` factor.
             plot: whether to plot the results of each step
             plot_dir: directory to save plots to
+            plot_formats: file formats (as file extensions) to save plots as, see `Pipeline`
         """
         steps: list[Processor] = []
 
@@ -61,7 +63,7 @@ class TdtDefaultPipeline(Pipeline):
         if downsample is not None:
             steps.append(Downsample(_flatten_paired_signals(signals), window=downsample, factor=downsample))
 
-        super().__init__(steps=steps, plot=plot, plot_dir=plot_dir)
+        super().__init__(steps=steps, plot=plot, plot_dir=plot_dir, plot_formats=plot_formats)
 
 
 # def tdt_default(
@@ -1,3 +1,5 @@
+from typing import Optional
+import joblib
 from matplotlib.axes import Axes
 import seaborn as sns
 
@@ -10,15 +12,19 @@ from ..common import ProcessorThatPlots, SignalList
 class DblExpFit(ProcessorThatPlots):
     """A `Processor` that fits a double exponential function."""
 
-    def __init__(self, signals: SignalList, apply: bool = True):
+    def __init__(self, signals: SignalList, apply: bool = True, n_jobs: Optional[int] = None, max_fit_samples: Optional[int] = None):
         """Initialize this processor.
 
         Args:
             signals: list of signal names to be fitted
             apply: if True, detrend the signal using the double exponential fit. If False, only calculate the fit.
+            n_jobs: number of signals to fit concurrently on threads, see `joblib.Parallel()`. When fitting a single 2D signal, its observations are fit concurrently instead. If None, fits run sequentially.
+            max_fit_samples: if not None, fit to approximately this many evenly spaced samples, see `fit_double_exponential()`. If None, all samples are used.
         """
         self.signals = signals
         self.apply = apply
+        self.n_jobs = n_jobs
+        self.max_fit_samples = max_fit_samples
 
     def __call__(self, session: Session) -> Session:
         """Effect this processing step.
@@ -29,19 +35,26 @@ class DblExpFit(ProcessorThatPlots):
         Returns:
             Session with the processing step applied
         """
+        # create new signals to hold the double exponential fits
         for signame in self.signals:
-            sig = session.signals[signame]
+            session.add_signal(session.signals[signame].copy(f"{signame}_dxpfit"))
 
-            # create a new signal to hold the double exponential fit
-            dxp_sig = sig.copy(f"{signame}_dxpfit")
-            session.add_signal(dxp_sig)
+        # calculate the fits and the detrended signals, each signal is fit independently. Parallelize at one level only, across
+        # signals when there are several, otherwise across the observations of the signal, so threads are not oversubscribed
+        outer_jobs, inner_jobs = (self.n_jobs, None) if len(self.signals) > 1 else (None, self.n_jobs)
+        results = joblib.Parallel(n_jobs=outer_jobs, prefer="threads")(
+            joblib.delayed(detrend_double_exponential)(
+                session.signals[signame].time, session.signals[signame].signal, n_jobs=inner_jobs, max_fit_samples=self.max_fit_samples
+            )
+            for signame in self.signals
+        )
 
-            # calculate the fit and the detrended signal
-            detrended, dxp_sig.signal = detrend_double_exponential(sig.time, sig.signal)
+        for signame, (detrended, fit) in zip(self.signals, results):
+            session.signals[f"{signame}_dxpfit"].signal = fit
 
             # if the user requested, apply detrending to the signal
             if self.apply:
-                sig.signal = detrended
+                session.signals[signame].signal = detrended
 
         return session
 
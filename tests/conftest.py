@@ -1,9 +1,11 @@
 import multiprocessing
 import matplotlib
+import numpy as np
 import os
 from typing import Literal, cast
 import pytest
 
+from fptools.io import Session, Signal
 from fptools.io.data_loader import load_data, SessionCollection
 from fptools.io.test import download_test_data
 from fptools.preprocess.pipelines import LowpassDFFPipeline
@@ -135,3 +137,25 @@ def ma_preprocessed_sessions(ma_test_data_path) -> SessionCollection:
     sessions.rename_epoc('F', 'rewarded_nosepoke')
 
     return sessions
+
+
+@pytest.fixture
+def synthetic_sessions() -> SessionCollection:
+    """Fixture to provide small, randomly generated sessions which do not depend on the test data download.
+
+    Each session has a 2D random walk signal named "signal" (4 trials), two 1D noisy signals named "signal1" and "signal2",
+    and two epocs named "event1" and "event2".
+    """
+    rng = np.random.default_rng(0)
+    sessions = SessionCollection()
+    for i in range(3):
+        session = Session()
+        session.name = f"session{i}"
+        session.metadata["subject"] = f"mouse{i}"
+        session.add_signal(Signal("signal", np.cumsum(rng.normal(size=(4, 2000)), axis=1), fs=100))
+        session.add_signal(Signal("signal1", 5 + rng.normal(size=20000), fs=100))
+        session.add_signal(Signal("signal2", 2 + rng.normal(size=20000), fs=100))
+        session.epocs["event1"] = np.sort(rng.uniform(5, 190, size=30))
+        session.epocs["event2"] = np.sort(rng.uniform(5, 190, size=20))
+        sessions.append(session)
+    return sessions
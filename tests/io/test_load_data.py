@@ -109,3 +109,96 @@ def test_load_manifest(tdt_test_data_path):
     man_path_unsupported_ext = manifest_path.replace('.xlsx', '.pdf')
     with pytest.raises(ValueError):
         manifest = load_manifest(man_path_unsupported_ext, index='blockname')
+
+
+def _synthetic_loader(session, path):
+    session.add_signal(Signal("sig", np.sin(np.arange(1000)), fs=100))
+    session.epocs["evt"] = np.array([1.0, 2.0, 3.0])
+    return session
+
+
+def _synthetic_locator(path):
+    from fptools.io import DataTypeAdaptor
+
+    adaptors = []
+    for i in range(4):
+        adapt = DataTypeAdaptor()
+        adapt.path = path
+        adapt.name = f"block{i}"
+        adapt.loaders.append(_synthetic_loader)
+        adaptors.append(adapt)
+    return adaptors
+
+
+def test_load_thread_executor(tmp_path):
+    """Test that loading on a thread pool produces the same sessions.
+
+    Uses a synthetic locator and loader, so no test data is required.
+    """
+    sessions = load_data(str(tmp_path),
+                     max_workers=2,
+                     locator=_synthetic_locator,
+                     preprocess=None,
+                     cache=False,
+                     executor_type="thread")
+
+    assert len(sessions) == 4
+    assert sorted(s.name for s in sessions) == ["block0", "block1", "block2", "block3"]
+    for session in sessions:
+        assert session.signals["sig"].nsamples == 1000
+
+    with pytest.raises(ValueError):
+        load_data(str(tmp_path), locator=_synthetic_locator, cache=False, executor_type="fiber")
+
+
+def test_load_manifest_exclude(tmp_path):
+    """Test that blocks flagged in the manifest `exclude` column are not loaded, and blank flags are not excluded."""
+    manifest_path = os.path.join(str(tmp_path), "manifest.csv")
+    with open(manifest_path, "w") as f:
+        f.write("blockname,group,exclude\nblock0,A,True\nblock1,A,False\nblock2,B,\nblock3,B,False\n")
+
+    sessions = load_data(str(tmp_path),
+                     manifest_path=manifest_path,
+                     locator=_synthetic_locator,
+                     cache=False,
+                     executor_type="thread")
+
+    assert sorted(s.name for s in sessions) == ["block1", "block2", "block3"]
+    assert {s.name: s.metadata["group"] for s in sessions} == {"block1": "A", "block2": "B", "block3": "B"}
+
+    # block names in the manifest must be unique
+    with open(manifest_path, "a") as f:
+        f.write("block3,C,False\n")
+    with pytest.raises(ValueError):
+        load_data(str(tmp_path), manifest_path=manifest_path, locator=_synthetic_locator, cache=False, executor_type="thread")
+
+
+def test_load_cache_mmap(tmp_path):
+    """Test that sessions cached in the "mmap" format are reloaded equal to the originals."""
+    cache_dir = os.path.join(str(tmp_path), "cache")
+    kwargs = dict(locator=_synthetic_locator, cache=True, cache_dir=cache_dir, cache_format="mmap", executor_type="thread")
+    first = load_data(str(tmp_path), **kwargs)
+    second = load_data(str(tmp_path), **kwargs)
+
+    assert len(first) == len(second) == 4
+    second_by_name = {s.name: s for s in second}
+    for session in first:
+        assert session == second_by_name[session.name]
+        assert isinstance(second_by_name[session.name].signals["sig"].signal, np.memmap)
+
+
+def test_load_loky_executor(tmp_path):
+    """Test that loading on the reusable loky pool works, both when returning sessions and cache paths from workers."""
+    cache_dir = os.path.join(str(tmp_path), "cache")
+    for cache_format in ("gzip", "lzf", "mmap"):
+        sessions = load_data(str(tmp_path),
+                         max_workers=2,
+                         locator=_synthetic_locator,
+                         cache=True,
+                         cache_dir=os.path.join(cache_dir, cache_format),
+                         cache_format=cache_format,
+                         executor_type="loky")
+
+        assert sorted(s.name for s in sessions) == ["block0", "block1", "block2", "block3"]
+        for session in sessions:
+            np.testing.assert_allclose(session.signals["sig"].signal, np.sin(np.arange(1000)))
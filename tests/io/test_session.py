@@ -1,4 +1,8 @@
+import os
 from pathlib import Path
+import numpy as np
+from fptools.io import Signal
+from fptools.io.data_loader import _save_cache
 from fptools.io.session import Session
 
 
@@ -9,3 +13,118 @@ def test_session_save_load(tdt_preprocessed_sessions, tmp_path: Path):
         reconsitituted = Session.load(dest)
 
         assert session == reconsitituted
+
+
+def test_session_save_load_mmap(tmp_path: Path):
+    session = Session()
+    session.name = "synthetic"
+    session.metadata["group"] = "A"
+    session.add_signal(Signal("sig1", np.sin(np.arange(1000)), fs=100))
+    session.add_signal(Signal("sig2", np.vstack([np.cos(np.arange(1000))] * 3), fs=100))
+    session.epocs["evt"] = np.array([1.0, 2.0, 3.0])
+
+    dest = str(tmp_path.joinpath("synthetic.h5"))
+    session.save(dest, compression=None)
+    reconstituted = Session.load(dest, mmap=True)
+    assert session == reconstituted
+    assert isinstance(reconstituted.signals["sig1"].signal, np.memmap)
+
+    # memory-mapped signals are copy-on-write, the file on disk should not change
+    reconstituted.signals["sig1"].signal += 1
+    assert Session.load(dest) == session
+
+    # release the mapped session before overwriting its file, see `Session.load()`
+    del reconstituted
+
+    # compressed data cannot be memory-mapped, and should be read normally
+    session.save(dest)
+    reconstituted = Session.load(dest, mmap=True)
+    assert session == reconstituted
+    assert not isinstance(reconstituted.signals["sig1"].signal, np.memmap)
+
+
+def test_session_save_load_epocs_scalars(tmp_path: Path):
+    dest = str(tmp_path.joinpath("synthetic.h5"))
+
+    # epocs sharing a dtype are packed into a single dataset, mixed dtypes are stored separately
+    for epocs in [{"evt1": np.array([1.0, 2.0, 3.0]), "evt2": np.array([]), "evt3": np.array([4.5])},
+                  {"evt1": np.array([1.0, 2.0]), "evt2": np.array([1, 2, 3])}]:
+        session = Session()
+        session.name = "synthetic"
+        session.add_signal(Signal("sig", np.sin(np.arange(100)), fs=10))
+        session.epocs.update(epocs)
+        session.scalars["scalar1"] = np.array([0.5, 1.5])
+        session.scalars["scalar2"] = np.ones((2, 2))
+
+        session.save(dest)
+        reconstituted = Session.load(dest)
+        assert session == reconstituted
+        for k, v in epocs.items():
+            assert reconstituted.epocs[k].dtype == v.dtype
+
+
+def test_session_epoc_scalar_dataframe():
+    session = Session()
+    session.name = "synthetic"
+    session.metadata["subject"] = "mouse1"
+    session.metadata["age"] = 3
+    session.epocs["evt1"] = np.array([3.0, 1.0])
+    session.epocs["evt2"] = np.array([2.0])
+    session.epocs["evt3"] = np.array([])
+    session.scalars["scalar1"] = np.array([0.5, 1.5])
+
+    epocs = session.epoc_dataframe(include_meta=["subject"])
+    assert list(epocs.columns) == ["subject", "event", "time"]
+    assert list(epocs["time"]) == [1.0, 2.0, 3.0]
+    assert list(epocs["event"]) == ["evt1", "evt2", "evt1"]
+    assert set(epocs["subject"]) == {"mouse1"}
+    assert len(session.epoc_dataframe(include_epocs=["evt3"]).index) == 0
+
+    scalars = session.scalar_dataframe()
+    assert list(scalars.columns) == ["subject", "age", "scalar_name", "scalar_value"]
+    assert np.array_equal(scalars["scalar_value"].iloc[0], session.scalars["scalar1"])
+
+
+def test_cache_rewrite_keeps_mmap_sessions(tmp_path: Path):
+    session = Session()
+    session.name = "synthetic"
+    session.add_signal(Signal("sig", np.sin(np.arange(1000)), fs=100))
+
+    dest = str(tmp_path.joinpath("synthetic.h5"))
+    _save_cache(session, dest, compression=None)
+    mapped = Session.load(dest, mmap=True)
+    expected = mapped.signals["sig"].signal.copy()
+
+    # rewriting the cache must not disturb sessions which still map the previous file. Windows refuses to replace
+    # a mapped file, in which case the previous cache file is kept
+    replacement = Session()
+    replacement.name = "synthetic"
+    replacement.add_signal(Signal("sig", np.cos(np.arange(10)), fs=100))
+    written = _save_cache(replacement, dest, compression=None)
+
+    np.testing.assert_array_equal(mapped.signals["sig"].signal, expected)
+    assert Session.load(dest) == (replacement if written else session)
+    assert os.listdir(tmp_path) == ["synthetic.h5"]
+
+    # once the mapped session is released, the cache can always be replaced
+    del mapped
+    assert _save_cache(replacement, dest, compression=None)
+    assert Session.load(dest) == replacement
+
+
+def test_cache_rewrite_permission_error(tmp_path: Path, monkeypatch):
+    session = Session()
+    session.name = "synthetic"
+    session.add_signal(Signal("sig", np.sin(np.arange(1000)), fs=100))
+
+    dest = str(tmp_path.joinpath("synthetic.h5"))
+    assert _save_cache(session, dest, compression=None)
+
+    # simulate Windows refusing to replace a file which is still mapped
+    def refuse(src, dst):
+        raise PermissionError(dst)
+
+    monkeypatch.setattr(os, "replace", refuse)
+    assert not _save_cache(Session(), dest, compression=None)
+    assert os.listdir(tmp_path) == ["synthetic.h5"]
+    assert Session.load(dest) == session
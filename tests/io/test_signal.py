@@ -49,4 +49,90 @@ def test_signal_time_init():
 
     # test that time signal length mismatch raises ValueError
     with pytest.raises(ValueError):
-        Signal("sig1", np.sin(np.arange(1000)), time=np.arange(500), fs=None)
\ No newline at end of file
+        Signal("sig1", np.sin(np.arange(1000)), time=np.arange(500), fs=None)
+
+    # test that time which does not advance raises ValueError
+    with pytest.raises(ValueError):
+        Signal("sig1", np.sin(np.arange(1000)), time=np.zeros(1000), fs=1)
+
+
+def test_signal_nonuniform_time():
+    # jittered time, with one dropped sample, for which the median and span estimates of fs differ
+    rng = np.random.default_rng(42)
+    time = np.delete(np.arange(1000) + rng.uniform(-0.01, 0.01, size=1000), 500)
+    sig = Signal("sig1", np.sin(np.arange(999)), time=time)
+    assert sig.fs == approx(1, rel=1e-2)
+
+    # the inferred fs should be accepted back alongside time
+    assert Signal("sig2", sig.signal, time=sig.time, fs=sig.fs) == sig
+    copied = sig.copy()
+    assert copied.fs == sig.fs
+    assert np.array_equal(copied.time, sig.time)
+
+def test_signal_to_dataframe():
+    sig = Signal("sig1", np.vstack([np.sin(np.arange(100)), np.cos(np.arange(100))]), fs=1)
+
+    df = sig.to_dataframe()
+    assert df.shape == (2, 100)
+    assert list(df.columns[:2]) == ["Y.1", "Y.2"]
+    assert df.columns[-1] == "Y.100"
+
+    df_unnamed = sig.to_dataframe(named=False)
+    assert df_unnamed.shape == (2, 100)
+    assert df_unnamed.columns[0] == 1 and df_unnamed.columns[-1] == 100
+    assert np.array_equal(df.to_numpy(), df_unnamed.to_numpy())
+
+
+def test_signal_aggregate():
+    rng = np.random.default_rng(42)
+    data = rng.normal(size=(7, 500))
+    data[3, 10] = np.nan
+    sig = Signal("sig1", data, fs=10)
+    sig.marks["mark1"] = 1.0
+
+    for func in ["mean", "median", "sum", "std"]:
+        agg = sig.aggregate(func)
+        assert agg.name == f"sig1#{func}"
+        assert agg.nobs == 1
+        assert agg.marks == sig.marks
+        assert np.allclose(agg.signal, getattr(np, func)(data, axis=0), equal_nan=True)
+
+    # even number of observations for the median
+    even = Signal("sig2", data[:6], fs=10)
+    assert np.allclose(even.aggregate("median").signal, np.median(data[:6], axis=0), equal_nan=True)
+
+    # integer data yields a floating point median, as with numpy
+    int_data = rng.integers(0, 100, size=(7, 500))
+    for nobs in [7, 6]:
+        med = Signal("sig3", int_data[:nobs], fs=10).aggregate("median").signal
+        expected = np.median(int_data[:nobs], axis=0)
+        assert med.dtype == expected.dtype
+        assert np.array_equal(med, expected)
+
+
+def test_signal_compatible_nobs():
+    sig1 = Signal("sig1", np.ones((2, 100)), fs=1)
+    sig2 = Signal("sig2", np.ones((3, 100)), fs=1)
+    sig3 = Signal("sig3", np.ones((2, 100)), fs=1)
+
+    assert not sig1._check_other_compatible(sig2)
+    assert sig1._check_other_compatible(sig3)
+
+
+def test_signal_aggregate_ufunc():
+    data = np.arange(12, dtype=float).reshape(3, 4)
+    sig = Signal("sig1", data, fs=10)
+
+    agg = sig.aggregate(np.maximum)
+    assert agg.name == "sig1#maximum"
+    assert np.array_equal(agg.signal, data.max(axis=0))
+
+    assert np.array_equal(sig.aggregate("nanmax").signal, data.max(axis=0))
+    assert np.array_equal(sig.aggregate("var").signal, data.var(axis=0))
+
+
+def test_signal_tindices():
+    sig = Signal("sig1", np.zeros(1000), fs=100)
+    times = np.array([-1.0, 0.0, 0.015, 0.0151, 2.5, 9.99, 100.0])
+
+    assert np.array_equal(sig.tindices(times), [sig.tindex(t) for t in times])
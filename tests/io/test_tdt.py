@@ -0,0 +1,24 @@
+from pathlib import Path
+
+from fptools.io.tdt import find_tdt_blocks
+
+
+def test_find_tdt_blocks(tmp_path: Path):
+    # create a fake tank with blocks at various depths and extension casings
+    for block in ["block1", "nested/block2", "nested/deeper/block3", ".hidden/block4"]:
+        tmp_path.joinpath(block).mkdir(parents=True)
+    tmp_path.joinpath("block1", "block1.tbk").touch()
+    tmp_path.joinpath("nested", "block2", "block2.TBK").touch()
+    tmp_path.joinpath("nested", "deeper", "block3", "block3.Tbk").touch()
+    tmp_path.joinpath("nested", "deeper", "block3", "notes.txt").touch()
+    tmp_path.joinpath(".hidden", "block4", "block4.tbk").touch()
+
+    blocks = find_tdt_blocks(str(tmp_path))
+
+    assert sorted(b.name for b in blocks) == ["block1", "block2", "block3"]
+    for b in blocks:
+        assert b.path.endswith(b.name)
+        assert len(b.loaders) == 1
+
+    # as with glob, a missing directory yields no blocks rather than raising
+    assert find_tdt_blocks(str(tmp_path.joinpath("missing"))) == []
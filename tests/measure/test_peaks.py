@@ -1,7 +1,10 @@
 
 import numpy as np
+import pandas as pd
+from pytest import approx
+from scipy.integrate import trapezoid
 
-from fptools.io import Session, Signal
+from fptools.io import Session, SessionCollection, Signal
 from fptools.measure import measure_peaks, detect_naive_peaks, collect_signals
 
 
@@ -19,3 +22,53 @@ def test_detect_naive_peaks(tdt_preprocessed_sessions):
         session.add_signal(collect_signals(session, signal="Dopamine", event="RNP"))
     tdt_preprocessed_sessions.apply(collect_sigs)
     detect_naive_peaks(tdt_preprocessed_sessions, signal="Dopamine@RNP", window=(0.0, 1.0))
+
+
+def test_measure_peaks_synthetic(synthetic_sessions):
+    peaks = measure_peaks(synthetic_sessions, signal="signal", include_detection_params=True, distance=50)
+
+    assert len(peaks.index) > 0
+    assert set(peaks["subject"]) == {"mouse0", "mouse1", "mouse2"}
+    for col in ["trial", "peak_num", "peak_index", "peak_time", "peak_heights", "prominences", "widths", "auc", "param_distance"]:
+        assert col in peaks.columns
+
+    # spot check a peak against a direct calculation
+    row = peaks.iloc[5]
+    sig = synthetic_sessions[0].signals["signal"]
+    assert row["peak_heights"] == sig.signal[row["trial"], row["peak_index"]]
+    peak_slice = slice(row["left_bases"], row["right_bases"])
+    assert row["auc"] == approx(trapezoid(sig.signal[row["trial"], peak_slice], sig.time[peak_slice]))
+
+
+def test_measure_peaks_parallel(synthetic_sessions):
+    sequential = measure_peaks(synthetic_sessions, signal="signal", distance=50)
+    parallel = measure_peaks(synthetic_sessions, signal="signal", distance=50, n_jobs=2)
+    pd.testing.assert_frame_equal(sequential, parallel)
+
+
+def test_detect_naive_peaks_synthetic(synthetic_sessions):
+    peaks = detect_naive_peaks(synthetic_sessions, signal="signal", include_meta=["subject"], window=(2.0, 10.0))
+
+    assert list(peaks.columns) == ["subject", "trial", "peak_index", "peak_time", "peak_height"]
+    assert len(peaks.index) == 12
+    for _, row in peaks.iterrows():
+        sig = synthetic_sessions[int(row["subject"][-1])].signals["signal"]
+        start, stop = sig.tindex(2.0), sig.tindex(10.0)
+        assert row["peak_index"] == np.argmax(sig.signal[row["trial"], start:stop]) + start
+        assert row["peak_height"] == sig.signal[row["trial"], start:stop].max()
+
+
+def test_measure_peaks_skip_widths():
+    rng = np.random.default_rng(0)
+    session = Session()
+    session.metadata["subject"] = "a"
+    session.add_signal(Signal("sig", rng.normal(size=(5, 2000)), fs=100.0))
+    sessions = SessionCollection([session])
+
+    full = measure_peaks(sessions, "sig")
+    no_widths = measure_peaks(sessions, "sig", width=None)
+
+    for col in ["widths", "width_heights", "left_ips", "right_ips"]:
+        assert col in full.columns
+        assert col not in no_widths.columns
+    pd.testing.assert_frame_equal(full[no_widths.columns], no_widths)
@@ -2,7 +2,9 @@
 
 
 from pytest import approx
-from fptools.measure import collect_signals, collect_signals_2event
+import numpy as np
+from fptools.io import Session, Signal
+from fptools.measure import collect_signals, collect_signals_2event, collect_signals_multi
 
 
 def test_collect_signals(tdt_preprocessed_sessions):
@@ -27,3 +29,19 @@ def test_collect_signals_2event(tdt_preprocessed_sessions):
                             inter=2.0,
                             post=2.0)
         assert sig.duration.total_seconds() == approx(6.0, rel=sig.fs)
+
+
+def test_collect_signals_multi():
+    session = Session()
+    session.add_signal(Signal("sig", np.arange(1000, dtype=float), fs=10))
+    session.epocs["evt"] = np.array([0.0, 20.0, 99.9])
+
+    windows = [(-1.0, 0.0), (0.0, 2.0), (-5.0, 5.0)]
+    collected = collect_signals_multi(session, "evt", "sig", windows)
+
+    assert len(collected) == len(windows)
+    for (start, stop), sig in zip(windows, collected):
+        expected = collect_signals(session, "evt", "sig", start=start, stop=stop)
+        assert sig.name == expected.name
+        assert np.array_equal(sig.signal, expected.signal)
+        assert np.array_equal(sig.time, expected.time)
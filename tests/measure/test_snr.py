@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+from pytest import approx
+
+from fptools.measure import measure_snr_event, measure_snr_overall
+
+
+def test_measure_snr_overall(synthetic_sessions):
+    snr = measure_snr_overall(synthetic_sessions, ["signal1", "signal2"])
+
+    assert len(snr.index) == 6
+    assert list(snr["signal"]) == ["signal1", "signal2"] * 3
+    sig = synthetic_sessions[0].signals["signal1"].signal
+    assert snr["snr"].iloc[0] == approx(np.log10(np.mean(sig) ** 2 / np.std(sig) ** 2))
+
+    pd.testing.assert_frame_equal(snr, measure_snr_overall(synthetic_sessions, ["signal1", "signal2"], n_jobs=2))
+
+
+def test_measure_snr_event(synthetic_sessions):
+    snr = measure_snr_event(synthetic_sessions, ["signal1", "signal2"], ["event1", "event2"], noise_range=(-1, 0), signal_range=(0, 1))
+
+    assert len(snr.index) == 12
+    assert set(snr["subject"]) == {"mouse0", "mouse1", "mouse2"}
+    assert np.all(np.isfinite(snr["snr"]))
+
+    parallel = measure_snr_event(
+        synthetic_sessions,
+        ["signal1", "signal2"],
+        ["event1", "event2"],
+        noise_range=(-1, 0),
+        signal_range=(0, 1),
+        include_meta=["subject"],
+        n_jobs=2,
+    )
+    assert list(parallel.columns) == ["subject", "signal", "snr"]
+    assert np.allclose(parallel["snr"], snr["snr"])
@@ -1,9 +1,10 @@
 import numpy as np
 import matplotlib.pyplot as plt
+import pytest
 
 from fptools.io import Session, Signal
 from fptools.preprocess.steps import DblExpFit
-from fptools.preprocess.lib import double_exponential, fs2t
+from fptools.preprocess.lib import _double_exponential_jacobian, double_exponential, fit_double_exponential, fs2t
 
 def _gen_data(sig_name: str, ndim: int = 1):
     t = fs2t(1, 1000)
@@ -73,3 +74,47 @@ def test_dbl_exp_fit_with_apply():
     assert session.signals["signal2_dxpfit"].nsamples == 1000, "Signal should have 1000 samples"
     assert np.isclose(session.signals["signal2"].signal[0].sum(), 0, atol=1e-5), "detrended signal sum should be close to 0"
 
+
+
+def test_dbl_exp_fit_parallel():
+    session = Session()
+    session.add_signal(_gen_data("signal1", ndim=2))
+    session.add_signal(_gen_data("signal2", ndim=2))
+
+    DblExpFit(["signal1"], apply=False)(session)
+    DblExpFit(["signal2"], apply=False, n_jobs=2)(session)
+
+    assert np.array_equal(session.signals["signal1_dxpfit"].signal, session.signals["signal2_dxpfit"].signal), "Parallel fit should match sequential fit"
+
+
+def test_dbl_exp_fit_max_fit_samples():
+    session = Session()
+    session.add_signal(_gen_data("signal1", ndim=2))
+    session.add_signal(_gen_data("signal2", ndim=2))
+
+    DblExpFit(["signal1"], apply=False)(session)
+    DblExpFit(["signal2"], apply=False, max_fit_samples=100)(session)
+
+    assert session.signals["signal2_dxpfit"].nsamples == 1000, "Fit should be evaluated at every sample"
+    assert np.allclose(session.signals["signal1_dxpfit"].signal, session.signals["signal2_dxpfit"].signal), "Subsampled fit should match full fit"
+
+    with pytest.raises(ValueError):
+        fit_double_exponential(session.signals["signal1"].time, session.signals["signal1"].signal, max_fit_samples=0)
+
+
+def test_double_exponential_jacobian():
+    t = fs2t(1, 1000)
+    for params in [
+        np.array([1.66410966e-04, 7.75225962e00, 1.59735799e02, 1.23719300e04, 1.33545428e-02]),
+        np.array([10.0, 5.0, 2.0, 600.0, 0.5]),
+        np.array([0.0, 1.0, 1.0, 3600.0, 0.1]),
+    ]:
+        jac = _double_exponential_jacobian(t, *params)
+        assert jac.shape == (t.shape[0], 5)
+
+        # compare each column against central differences of `double_exponential()`
+        for i in range(5):
+            step = np.zeros(5)
+            step[i] = 1e-6 * max(abs(params[i]), 1.0)
+            numeric = (double_exponential(t, *(params + step)) - double_exponential(t, *(params - step))) / (2 * step[i])
+            assert np.allclose(jac[:, i], numeric, rtol=1e-5, atol=1e-8), f"jacobian column {i} does not match central differences"
@@ -1,8 +1,10 @@
 import numpy as np
 import matplotlib.pyplot as plt
+import pytest
 
 from fptools.io import Session, Signal
 from fptools.preprocess.steps import Lowpass
+from fptools.preprocess.lib import lowpass_filter
 
 
 def test_lowpass_signals():
@@ -26,4 +28,17 @@ def test_lowpass_signals():
     assert session.signals["signal2_lowpass"].nobs == 2, "Signal should have 2 observations"
     assert session.signals["signal2_lowpass"].nsamples == 1000, "Signal should have 1000 samples"
     assert np.isclose(session.signals["signal2_lowpass"].signal[0, 0], 0.9941761993621171), "first sample should be about 1"
-    assert np.isclose(session.signals["signal2_lowpass"].signal[0, 500], -1.0912116567615586e-05), "middle samples should be about 0"
\ No newline at end of file
+    assert np.isclose(session.signals["signal2_lowpass"].signal[0, 500], -1.0912116567615586e-05), "middle samples should be about 0"
+
+def test_lowpass_filter_padlen():
+    signal = np.sin(np.arange(1000) + 1)
+
+    # padlen is handed to `sosfiltfilt()`, which changes the edges of the filtered signal
+    default = lowpass_filter(signal, fs=1, Wn=0.1)
+    unpadded = lowpass_filter(signal, fs=1, Wn=0.1, padlen=0)
+    assert not np.allclose(default[:10], unpadded[:10])
+    assert np.allclose(default[400:600], unpadded[400:600], atol=1e-6)
+
+    # padding longer than the signal is rejected by `sosfiltfilt()`
+    with pytest.raises(ValueError):
+        lowpass_filter(signal, fs=1, Wn=0.1, padlen=signal.shape[0])
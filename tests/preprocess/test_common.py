@@ -0,0 +1,25 @@
+from pathlib import Path
+
+import numpy as np
+
+from fptools.io import Session, Signal
+from fptools.preprocess.common import Pipeline
+
+
+def test_pipeline_plot_formats(tmp_path: Path):
+    session = Session()
+    session.name = "session1"
+    session.add_signal(Signal("signal1", np.sin(np.arange(1000)), fs=100))
+
+    for plot_formats in [("svg",), ("png", "pdf")]:
+        plot_dir = tmp_path.joinpath("_".join(plot_formats))
+        plot_dir.mkdir()
+        Pipeline(steps=[lambda s: s], plot=True, plot_dir=str(plot_dir), plot_formats=plot_formats)(session)
+
+        assert sorted(p.name for p in plot_dir.iterdir()) == sorted(f"session1.{fmt}" for fmt in plot_formats), "only the requested formats should be saved"
+
+    # no plots are saved when plotting is disabled
+    plot_dir = tmp_path.joinpath("no_plot")
+    plot_dir.mkdir()
+    Pipeline(steps=[lambda s: s], plot=False, plot_dir=str(plot_dir))(session)
+    assert list(plot_dir.iterdir()) == []